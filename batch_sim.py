@@ -0,0 +1,347 @@
+"""Пакетный симулятор N независимых игр на NumPy.
+
+Каждая игра - строка в массивах (struct-of-arrays): состояние динозавра,
+позиции кактусов и птеродактилей. Гравитация, прокрутка, появление
+препятствий, столкновения и автопилот считаются векторно сразу для всех игр.
+Физика повторяет Dino.update, Game.update и правила появления объектов из
+main.Course, включая округление координат pygame.Rect.
+Автопилот повторяет эвристику Dino (стратегия 'heuristic'), поэтому для
+сравнения с Game динозавру нужно задать эту стратегию.
+Столкновения, как и в Game.find_collision, проверяются по маскам спрайтов:
+векторная AABB отбирает кандидатов, маски сравниваются только для них.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from main import (SCREEN_WIDTH, SCREEN_HEIGHT, FPS, DEFAULT_JUMP_MULTIPLIERS,
+                  BASE_DIR, Game, Pterodactyl, assets)
+
+# Причины проигрыша
+DEATH_NONE = 0
+DEATH_CACTUS = 1
+DEATH_PTERODACTYL = 2
+
+# Размеры объектов как в main.py
+DINO_X = 10
+DINO_WIDTH = 40
+DINO_HEIGHT = 43
+CACTUS_WIDTH = 20
+CACTUS_HEIGHT = 40
+PTERO_WIDTH = 40
+PTERO_HEIGHT = 35
+PTERO_HEIGHTS = np.array([SCREEN_HEIGHT - 40 - 40, SCREEN_HEIGHT - 80 - 40])
+# Кадр анимации меняется каждые 10 тиков, кадров два
+ANIMATION_PERIOD = 20
+
+# Максимум одновременно живых объектов на одну игру:
+# кактусы идут с шагом не меньше 300 px, птеродактили - 400 px
+CACTUS_SLOTS = 4
+PTERO_SLOTS = 3
+
+
+def rect_round(values):
+    """Округление как при присваивании float в pygame.Rect (половины от нуля)"""
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+class BatchSimulator:
+    """N параллельных игр, которые продвигаются синхронно по тикам"""
+    def __init__(self, n, seed=None, frame_ms=1000 / FPS, auto_mode=True,
+                 vision_distance=250, jump_adjustment=1.0, jump_distances=None,
+                 jump_multipliers=None):
+        self.n = n
+        self.frame_ms = frame_ms
+        self.rng = np.random.default_rng(seed)
+        self.auto_mode = auto_mode
+
+        # Параметры динозавра как в Dino.__init__
+        self.gravity = 0.6
+        self.min_jump_velocity = -6
+        self.max_jump_velocity = -8
+        self.max_jump_time = 150
+        self.vision_distance = vision_distance
+        self.jump_adjustment = jump_adjustment
+        self.jump_distances = {'near': 60, 'medium': 120, 'far': 180}
+        self.jump_distances.update(jump_distances or {})
+        self.jump_multipliers = dict(DEFAULT_JUMP_MULTIPLIERS)
+        self.jump_multipliers.update(jump_multipliers or {})
+
+        # Параметры игры как в Game.__init__
+        self.initial_game_speed = 4
+        self.speed_increment = 0.001
+        self.max_game_speed = 8
+
+        # Маски кадров спрайтов из общего реестра main.assets
+        self.walk_masks = [
+            assets.get_mask(os.path.join(BASE_DIR, "images", name), DINO_WIDTH, DINO_HEIGHT)
+            for name in ("dino_walk_1.png", "dino_walk_2.png")
+        ]
+        self.cactus_masks = [assets.get_mask(Game.cactus_image_path, CACTUS_WIDTH, CACTUS_HEIGHT)]
+        self.ptero_masks = [
+            assets.get_mask(path, PTERO_WIDTH, PTERO_HEIGHT) for path in Pterodactyl.fly_image_paths
+        ]
+
+        self.reset()
+
+    def reset(self):
+        """Сбрасывает все игры в начальное состояние"""
+        n = self.n
+        # Динозавр
+        self.dino_y = np.full(n, SCREEN_HEIGHT - DINO_HEIGHT, dtype=np.int64)
+        self.velocity = np.zeros(n)
+        self.is_jumping = np.zeros(n, dtype=bool)
+        self.is_jump_pressed = np.zeros(n, dtype=bool)
+        self.jump_time = np.zeros(n)
+        self.is_crashed = np.zeros(n, dtype=bool)
+        self.is_game_over = np.zeros(n, dtype=bool)
+        self.auto_jump_power = np.full(n, -6.0)
+        self.auto_jump_duration = np.zeros(n)
+        self.animation_count = np.zeros(n, dtype=np.int64)
+
+        # Игра
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frames = np.zeros(n, dtype=np.int64)
+        self.game_speed = np.full(n, float(self.initial_game_speed))
+        self.death_cause = np.full(n, DEATH_NONE, dtype=np.int8)
+
+        # Препятствия: фиксированные слоты с флагом занятости
+        self.cactus_x = np.zeros((n, CACTUS_SLOTS), dtype=np.int64)
+        self.cactus_active = np.zeros((n, CACTUS_SLOTS), dtype=bool)
+        self.ptero_x = np.zeros((n, PTERO_SLOTS), dtype=np.int64)
+        self.ptero_y = np.zeros((n, PTERO_SLOTS), dtype=np.int64)
+        self.ptero_active = np.zeros((n, PTERO_SLOTS), dtype=bool)
+        self.ptero_animation = np.zeros((n, PTERO_SLOTS), dtype=np.int64)
+
+    @property
+    def done(self):
+        return self.is_game_over
+
+    def collides(self, x, y, width, height):
+        """AABB пересечение динозавра с объектами (как Rect.colliderect)"""
+        dino_y = self.dino_y[:, None]
+        return ((DINO_X < x + width) & (x < DINO_X + DINO_WIDTH) &
+                (dino_y < y + height) & (y < dino_y + DINO_HEIGHT))
+
+    def overlaps(self, candidates, x, y, masks, animation=None):
+        """Попиксельная проверка пар (игра, слот), прошедших AABB"""
+        hit = np.zeros(self.n, dtype=bool)
+        for row, slot in zip(*np.nonzero(candidates)):
+            dino_mask = self.walk_masks[self.animation_count[row] // 10]
+            frame = 0 if animation is None else animation[row, slot] // 10
+            offset = (int(x[row, slot]) - DINO_X, int(y[row, slot]) - int(self.dino_y[row]))
+            if dino_mask.overlap(masks[frame], offset):
+                hit[row] = True
+        return hit
+
+    def update_dino(self, alive):
+        """Векторная версия Dino.update"""
+        moving = alive & ~self.is_crashed
+
+        # Обновление прыжка
+        holding = moving & self.is_jumping & self.is_jump_pressed
+        self.jump_time = np.where(holding, self.jump_time + self.frame_ms, self.jump_time)
+        boost = holding & (self.jump_time <= self.max_jump_time) & (self.velocity > self.max_jump_velocity)
+        boosted = np.maximum(
+            self.max_jump_velocity,
+            self.min_jump_velocity - (self.jump_time / self.max_jump_time) * 2
+        )
+        self.velocity = np.where(boost, boosted, self.velocity)
+
+        # Гравитация
+        self.velocity = np.where(moving, self.velocity + self.gravity, self.velocity)
+        self.dino_y = np.where(moving, rect_round(self.dino_y + self.velocity), self.dino_y)
+
+        # Ограничение по земле
+        landed = moving & (self.dino_y + DINO_HEIGHT > SCREEN_HEIGHT)
+        self.dino_y[landed] = SCREEN_HEIGHT - DINO_HEIGHT
+        self.velocity[landed] = 0
+        self.is_jumping[landed] = False
+        self.is_jump_pressed[landed] = False
+        self.jump_time[landed] = 0
+
+        # Анимация
+        self.animation_count = np.where(moving, (self.animation_count + 1) % ANIMATION_PERIOD,
+                                        self.animation_count)
+
+    def crash(self, hit, cause):
+        hit = hit & ~self.is_crashed
+        self.is_crashed |= hit
+        self.death_cause[hit] = cause
+
+    def spawn_obstacles(self, alive):
+        """Векторная версия появления кактусов в Course.generate"""
+        active = self.cactus_active
+        any_active = active.any(axis=1)
+        last_right = np.where(active, self.cactus_x + CACTUS_WIDTH, np.iinfo(np.int64).min).max(axis=1)
+        spawn = alive & (~any_active | (last_right < SCREEN_WIDTH - 300))
+        rows = np.nonzero(spawn)[0]
+        if rows.size:
+            slots = np.argmin(active[rows], axis=1)
+            self.cactus_x[rows, slots] = SCREEN_WIDTH
+            self.cactus_active[rows, slots] = True
+
+    def spawn_pterodactyls(self, alive):
+        """Векторная версия появления птеродактилей в Course.generate"""
+        active = self.ptero_active
+        any_active = active.any(axis=1)
+        last_right = np.where(active, self.ptero_x + PTERO_WIDTH, np.iinfo(np.int64).min).max(axis=1)
+        spawn = (alive & (self.score > 500) &
+                 (~any_active | (last_right < SCREEN_WIDTH - 400)) &
+                 (self.rng.random(self.n) < 0.01))
+        rows = np.nonzero(spawn)[0]
+        if rows.size:
+            slots = np.argmin(active[rows], axis=1)
+            self.ptero_x[rows, slots] = SCREEN_WIDTH
+            self.ptero_y[rows, slots] = self.rng.choice(PTERO_HEIGHTS, size=rows.size)
+            self.ptero_active[rows, slots] = True
+            self.ptero_animation[rows, slots] = 0
+
+    def autopilot(self, alive):
+        """Векторная версия Dino.should_jump и Dino.calculate_jump_power"""
+        playing = alive & ~self.is_crashed
+        dino_right = DINO_X + DINO_WIDTH
+        dino_bottom = self.dino_y + DINO_HEIGHT
+        inf = np.iinfo(np.int64).max
+
+        # Ближайшее препятствие впереди; при равенстве выигрывает кактус,
+        # так как в Dino.should_jump кактусы идут в списке первыми
+        cactus_ahead = self.cactus_active & (self.cactus_x > dino_right)
+        cactus_dist = np.where(cactus_ahead, self.cactus_x - dino_right, inf).min(axis=1)
+        ptero_ahead = self.ptero_active & (self.ptero_x > dino_right)
+        ptero_dist_all = np.where(ptero_ahead, self.ptero_x - dino_right, inf)
+        ptero_slot = np.argmin(ptero_dist_all, axis=1)
+        ptero_dist = ptero_dist_all[np.arange(self.n), ptero_slot]
+        ptero_bottom = self.ptero_y[np.arange(self.n), ptero_slot] + PTERO_HEIGHT
+
+        is_ptero = ptero_dist < cactus_dist
+        distance = np.minimum(cactus_dist, ptero_dist)
+        has_nearest = distance < inf
+        high_ptero = is_ptero & (ptero_bottom < SCREEN_HEIGHT - 60)
+
+        # Дистанция начала прыжка
+        jump_distance = np.full(self.n, self.vision_distance * 0.4)
+        multipliers = self.jump_multipliers
+        jump_distance *= np.where(is_ptero,
+                                  np.where(high_ptero, multipliers['high_ptero_distance'],
+                                           multipliers['low_ptero_distance']),
+                                  1 + (CACTUS_HEIGHT / 40.0) * 0.2)
+        jump_distance *= self.game_speed / 4.0
+        in_range = playing & has_nearest & (distance <= jump_distance)
+
+        # Сила и длительность прыжка
+        near = distance < self.jump_distances['near']
+        medium = distance < self.jump_distances['medium']
+        base_power = np.where(near, self.max_jump_velocity * multipliers['near_power'],
+                              np.where(medium, self.max_jump_velocity * 1.1, self.max_jump_velocity))
+        duration = np.where(near, self.max_jump_time * 0.9,
+                            np.where(medium, self.max_jump_time * 0.8, self.max_jump_time * 0.7))
+
+        obstacle_top = np.where(is_ptero, ptero_bottom - PTERO_HEIGHT, SCREEN_HEIGHT - CACTUS_HEIGHT)
+        height_diff = dino_bottom - obstacle_top
+        power_factor = np.where(
+            is_ptero, np.where(high_ptero, multipliers['high_ptero_power'], 0.9),
+            np.where(height_diff > 35, multipliers['tall_cactus_power'],
+                     np.where(height_diff > 25, 1.1, 1.0)))
+        duration_factor = np.where(
+            is_ptero, np.where(high_ptero, 0.9, 0.7),
+            np.where(height_diff > 35, 0.95, np.where(height_diff > 25, 0.85, 1.0)))
+        base_power = base_power * power_factor
+        duration = duration * duration_factor
+
+        speed_factor = 1 + (self.game_speed - 4) * 0.15
+        power = base_power * speed_factor * self.jump_adjustment
+        power = np.maximum(np.minimum(power, -5), -10)
+        duration = np.maximum(np.minimum(duration, self.max_jump_time), self.max_jump_time * 0.4)
+
+        self.auto_jump_power = np.where(in_range, power, self.auto_jump_power)
+        self.auto_jump_duration = np.where(in_range, duration, self.auto_jump_duration)
+        should_jump = in_range & (dino_bottom >= SCREEN_HEIGHT - 1)
+
+        # Dino.start_jump
+        start = should_jump & ~self.is_jumping & (dino_bottom >= SCREEN_HEIGHT)
+        self.is_jumping |= start
+        self.is_jump_pressed |= start
+        self.jump_time[start] = 0
+        self.velocity = np.where(start, self.auto_jump_power, self.velocity)
+
+        # Dino.stop_jump
+        stop = playing & ~should_jump & self.is_jumping & (self.jump_time >= self.auto_jump_duration)
+        self.is_jump_pressed[stop] = False
+
+    def step(self):
+        """Один тик Game.update для всех игр сразу"""
+        # Тик, на котором игра замечает проигрыш, тоже считается кадром
+        self.frames += ~self.is_game_over
+        self.is_game_over |= self.is_crashed
+        alive = ~self.is_game_over
+        if not alive.any():
+            return
+
+        self.update_dino(alive)
+
+        # Обновление препятствий
+        moving = self.cactus_active & alive[:, None]
+        self.cactus_x = np.where(moving, rect_round(self.cactus_x - self.game_speed[:, None]), self.cactus_x)
+        cactus_y = np.full_like(self.cactus_x, SCREEN_HEIGHT - CACTUS_HEIGHT)
+        candidates = moving & self.collides(self.cactus_x, cactus_y, CACTUS_WIDTH, CACTUS_HEIGHT)
+        hit = self.overlaps(candidates, self.cactus_x, cactus_y, self.cactus_masks)
+        self.cactus_active &= ~(moving & (self.cactus_x + CACTUS_WIDTH < 0))
+        self.crash(hit, DEATH_CACTUS)
+
+        self.spawn_obstacles(alive)
+        self.spawn_pterodactyls(alive)
+        self.score += alive
+
+        # Увеличиваем скорость игры
+        faster = alive & (self.game_speed < self.max_game_speed)
+        self.game_speed = np.where(
+            faster,
+            np.minimum(self.max_game_speed, self.initial_game_speed + self.score * self.speed_increment),
+            self.game_speed
+        )
+
+        # Обновление птеродактилей
+        moving = self.ptero_active & alive[:, None]
+        self.ptero_x = np.where(moving, rect_round(self.ptero_x - (self.game_speed[:, None] + 4)), self.ptero_x)
+        self.ptero_animation = np.where(moving, (self.ptero_animation + 1) % ANIMATION_PERIOD,
+                                        self.ptero_animation)
+        candidates = moving & self.collides(self.ptero_x, self.ptero_y, PTERO_WIDTH, PTERO_HEIGHT)
+        hit = self.overlaps(candidates, self.ptero_x, self.ptero_y, self.ptero_masks, self.ptero_animation)
+        self.ptero_active &= ~(moving & (self.ptero_x + PTERO_WIDTH < 0))
+        self.crash(hit, DEATH_PTERODACTYL)
+
+        if self.auto_mode:
+            self.autopilot(alive)
+
+    def run(self, max_frames=100000):
+        """Продвигает игры до проигрыша всех или лимита кадров, возвращает счета"""
+        for _ in range(max_frames):
+            if self.is_game_over.all():
+                break
+            self.step()
+        return self.score.copy()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная симуляция игр на NumPy")
+    parser.add_argument("--games", type=int, default=1000, help="количество параллельных игр")
+    parser.add_argument("--frames", type=int, default=20000, help="максимум кадров на игру")
+    parser.add_argument("--seed", type=int, default=None, help="зерно генератора")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    simulator = BatchSimulator(args.games, seed=args.seed)
+    started = time.perf_counter()
+    scores = simulator.run(args.frames)
+    elapsed = time.perf_counter() - started
+    causes = np.bincount(simulator.death_cause, minlength=3)
+    print(f"Игр: {args.games}, {elapsed:.2f} с, кадров всего: {int(simulator.frames.sum())}")
+    print(f"Счет: средний {scores.mean():.1f}, медиана {np.median(scores):.0f}, "
+          f"лучший {scores.max()}")
+    print(f"Проигрыши: кактус {causes[DEATH_CACTUS]}, птеродактиль {causes[DEATH_PTERODACTYL]}, "
+          f"живы {causes[DEATH_NONE]}")
@@ -0,0 +1,279 @@
+"""Бенчмарки горячих путей игры.
+
+Запускается без окна (SDL dummy драйвер) и измеряет Game.update при
+увеличенном числе объектов, Game.draw днем, ночью и во время перехода,
+инверсию спрайтов разного размера, импорт main и фазы старта окна (в
+отдельных процессах), initialize_images (теплый и пустой кэш растров),
+создание Game (холодный и теплый старт) и reset_game_state.
+Результаты пишутся в JSON и сравниваются с сохраненным эталоном.
+
+    python bench.py --output results.json
+    python bench.py --save-baseline
+    python bench.py --baseline bench_baseline.json --tolerance 0.25
+"""
+import os
+
+# Окно и звук не нужны: выбираем заглушки SDL до импорта pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pygame
+
+import main
+
+DEFAULT_BASELINE = "bench_baseline.json"
+
+
+def measure(func, number, repeat, setup=None):
+    """Время одного вызова func в микросекундах: медиана и минимум по повторам"""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number * 1e6)
+    return {
+        "median_us": statistics.median(timings),
+        "min_us": min(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def make_game():
+    # Окно нужно для convert_alpha, как в обычной игре
+    pygame.display.set_mode((main.SCREEN_WIDTH, main.SCREEN_HEIGHT))
+    game = main.Game(seed=0)
+    game.profiler.enabled = False
+    game.show_debug = False
+    return game
+
+
+def populate(game, scale):
+    """Заполняет игру объектами: scale раз больше обычного количества"""
+    game.reset_game_state(seed=0)
+    rng = game.rng
+    clouds = sorted(
+        (100 + (i * 97) % (main.SCREEN_WIDTH - 100),
+         rng.randint(20, 80), rng.randint(60, 65), rng.randint(20, 25))
+        for i in range(3 * scale)
+    )
+    obstacles = sorted(120 + (i * 131) % (main.SCREEN_WIDTH - 120) for i in range(2 * scale))
+    pterodactyls = sorted(
+        (150 + (i * 173) % (main.SCREEN_WIDTH - 150), rng.choice(main.Pterodactyl.heights))
+        for i in range(scale)
+    )
+    # Слои рассчитывают на объекты, добавленные по возрастанию x
+    for x, y, width, height in clouds:
+        game.clouds.spawn(x, y, width, height)
+    for x in obstacles:
+        game.obstacles.spawn(x, main.SCREEN_HEIGHT - 40, 20, 40)
+    for x, y in pterodactyls:
+        game.pterodactyls.spawn(x, y, 40, 35)
+
+
+def keep_alive_update(game):
+    """Game.update, которая не дает игре закончиться столкновением"""
+    game.update()
+    if game.dino.is_crashed:
+        game.dino.is_crashed = False
+        game.is_game_over = False
+
+
+def bench_update(game, results, quick):
+    for scale in (1, 10, 50):
+        results[f"update[x{scale}]"] = measure(
+            lambda: keep_alive_update(game),
+            number=20 if quick else 100, repeat=5,
+            setup=lambda scale=scale: populate(game, scale),
+        )
+
+
+def bench_draw(game, results, quick):
+    populate(game, 1)
+    states = {"day": 0.0, "night": 1.0, "transition": 0.5}
+    for name, progress in states.items():
+        game.transition_progress = progress
+        game.is_night = progress > 0
+        game.draw()  # Прогрев кэша ночных спрайтов
+        results[f"draw[{name}]"] = measure(game.draw, number=20 if quick else 100, repeat=5)
+    # Переход с постоянно меняющимся уровнем, как во время смены суток
+    levels = [i / 50 for i in range(1, 50)]
+
+    def draw_transition():
+        game.transition_progress = levels[game.frame % len(levels)]
+        game.frame += 1
+        game.draw()
+    results["draw[transition-sweep]"] = measure(draw_transition, number=49, repeat=3)
+    game.transition_progress = 0.0
+
+
+def bench_invert(results, quick):
+    for width, height in ((20, 40), (40, 43), (100, 5), (250, 15)):
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill((83, 83, 83, 255))
+        results[f"invert[{width}x{height}]"] = measure(
+            lambda surface=surface: main.invert_surface_keeping_alpha(surface),
+            number=5 if quick else 20, repeat=3,
+        )
+
+
+# Поэтапный старт окна в чистом процессе; печатает main.startup_times в JSON
+STARTUP_SCRIPT = """
+import json, main
+main.start_window(audio=False, seed=0)
+print(json.dumps(main.startup_times))
+"""
+
+
+def bench_startup_phases(results, quick):
+    """Импорт main и фазы старта окна: каждый повтор - новый процесс"""
+    runs = []
+    for _ in range(3 if quick else 7):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    for phase in runs[0]:
+        timings = [run[phase] * 1e6 for run in runs if phase in run]
+        results[f"startup[{phase}]"] = {
+            "median_us": statistics.median(timings),
+            "min_us": min(timings),
+            "number": 1,
+            "repeat": len(timings),
+        }
+
+
+def bench_startup(results, quick):
+    bench_startup_phases(results, quick)
+    results["initialize_images[warm]"] = measure(main.initialize_images, number=10, repeat=5)
+    cold = bench_initialize_images_cold(quick)
+    if cold is not None:
+        results["initialize_images[cold]"] = cold
+
+    results["Game()[cold]"] = measure(make_game, number=1, repeat=3 if quick else 10,
+                                      setup=main.assets.clear)
+    make_game()
+    results["Game()[warm]"] = measure(make_game, number=1, repeat=3 if quick else 10)
+
+
+def bench_initialize_images_cold(quick):
+    """initialize_images с пустым кэшем растров (нужен рабочий cairosvg)"""
+    try:
+        main.get_cairosvg()
+    except (ImportError, OSError) as e:
+        print(f"initialize_images[cold] пропущен: {str(e).splitlines()[0]}", file=sys.stderr)
+        return None
+
+    workdir = tempfile.mkdtemp(prefix="dino-bench-")
+    try:
+        def setup():
+            shutil.rmtree(workdir, ignore_errors=True)
+            main.raster_paths.clear()
+        return measure(lambda: main.initialize_images(cache_dir=workdir),
+                       number=1, repeat=2 if quick else 5, setup=setup)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        main.raster_paths.clear()
+        main.initialize_images()
+
+
+def bench_reset(game, results, quick):
+    results["reset_game_state"] = measure(game.reset_game_state, number=20 if quick else 100, repeat=5)
+
+
+def run_benchmarks(quick=False, only=None):
+    results = {}
+    game = make_game()
+    groups = {
+        "update": lambda: bench_update(game, results, quick),
+        "draw": lambda: bench_draw(game, results, quick),
+        "invert": lambda: bench_invert(results, quick),
+        "startup": lambda: bench_startup(results, quick),
+        "reset": lambda: bench_reset(game, results, quick),
+    }
+    for name, run in groups.items():
+        if only and name not in only:
+            continue
+        run()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Сравнивает медианы с эталоном, возвращает список регрессий"""
+    regressions = []
+    print(f"{'benchmark':<28} {'median us':>12} {'baseline':>12} {'ratio':>7}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<28} {result['median_us']:>12.1f} {'-':>12} {'-':>7}")
+            continue
+        ratio = result["median_us"] / base["median_us"] if base["median_us"] else float("inf")
+        flag = " REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{name:<28} {result['median_us']:>12.1f} {base['median_us']:>12.1f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(current):
+    print(f"{'benchmark':<28} {'median us':>12} {'min us':>12}")
+    for name, result in current["results"].items():
+        print(f"{name:<28} {result['median_us']:>12.1f} {result['min_us']:>12.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки Chrome Dino")
+    parser.add_argument("--output", help="записать результаты в JSON файл")
+    parser.add_argument("--baseline", help="сравнить с эталоном из JSON файла")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"сохранить результаты как эталон (по умолчанию {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="допустимое замедление относительно эталона (0.2 = 20%%)")
+    parser.add_argument("--quick", action="store_true", help="меньше повторов")
+    parser.add_argument("--only", nargs="+", choices=["update", "draw", "invert", "startup", "reset"],
+                        help="запустить только указанные группы")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    current = run_benchmarks(args.quick, args.only)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(f"Регрессии: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        print_results(current)
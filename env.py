@@ -0,0 +1,506 @@
+"""Программный интерфейс игры для обучения агентов (в стиле Gym).
+
+DinoEnv оборачивает headless Game: reset(seed) начинает эпизод, step(action)
+продвигает игру и возвращает наблюдение, награду и признаки конца эпизода.
+Наблюдение - вектор float32: состояние динозавра, ENTITY_SLOTS ближайших
+объектов (кактусы и птеродактили), которые еще не прошли динозавра, и
+UPCOMING_SLOTS следующих объектов трассы, которых еще нет на экране.
+С pixels=True наблюдение - стопка последних кадров экрана (uint8), которые
+PixelObserver читает с поверхности игры через pygame.surfarray без копии
+всего экрана.
+
+VectorDinoEnv шагает K окружений за один вызов в текущем процессе,
+SubprocVectorEnv раздает их по процессам. Наблюдения, награды и флаги
+пишутся в общие массивы (в разделяемой памяти для процессов), эпизоды
+перезапускаются автоматически.
+
+    python env.py --envs 64 --workers 4 --steps 5000
+"""
+import os
+
+# Окно и звук не нужны: выбираем заглушки SDL до импорта pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import multiprocessing as mp
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+import main
+
+# Действия: отпустить или удерживать прыжок
+ACTION_NOOP = 0
+ACTION_JUMP = 1
+ACTION_COUNT = 2
+
+# Наблюдение: y, скорость по вертикали и флаг прыжка динозавра, скорость игры,
+# затем для каждого слота объекта: дистанция до динозавра, y, ширина,
+# высота, флаг птеродактиля. Пустые слоты заполнены нулями. В конце слоты
+# будущих объектов трассы: тиков до появления у правого края, y, ширина,
+# высота, флаг птеродактиля.
+DINO_FEATURES = 4
+ENTITY_FEATURES = 5
+ENTITY_SLOTS = 3
+UPCOMING_SLOTS = 2
+UPCOMING_KINDS = (main.Course.CACTUS, main.Course.PTERODACTYL)
+OBSERVATION_SIZE = DINO_FEATURES + (ENTITY_SLOTS + UPCOMING_SLOTS) * ENTITY_FEATURES
+
+
+def observe(game, out):
+    """Записывает наблюдение игры в массив out формы (OBSERVATION_SIZE,)"""
+    dino = game.dino
+    out[0] = dino.rect.y
+    out[1] = dino.velocity
+    out[2] = dino.is_jumping
+    out[3] = game.game_speed
+    out[DINO_FEATURES:] = 0
+
+    # Оба слоя отсортированы по x: берем первые еще не прошедшие объекты каждого
+    entities = []
+    for layer, is_ptero in ((game.obstacles, 0.0), (game.pterodactyls, 1.0)):
+        taken = 0
+        for _, x, y, width, height, _ in layer.rows():
+            if x + width > dino.rect.left:
+                entities.append((x, y, width, height, is_ptero))
+                taken += 1
+                if taken == ENTITY_SLOTS:
+                    break
+    entities.sort(key=lambda item: item[0])
+    offset = DINO_FEATURES
+    for x, y, width, height, is_ptero in entities[:ENTITY_SLOTS]:
+        out[offset:offset + ENTITY_FEATURES] = (
+            x - dino.rect.right, y, width, height, is_ptero
+        )
+        offset += ENTITY_FEATURES
+
+    offset = DINO_FEATURES + ENTITY_SLOTS * ENTITY_FEATURES
+    for event in game.upcoming(UPCOMING_SLOTS, UPCOMING_KINDS):
+        out[offset:offset + ENTITY_FEATURES] = (
+            event.tick - game.score, event.y, event.width, event.height,
+            event.kind == main.Course.PTERODACTYL
+        )
+        offset += ENTITY_FEATURES
+    return out
+
+
+def frame_shape(grayscale=True, downsample=1):
+    """Форма одного кадра наблюдения: (высота, ширина) или (высота, ширина, 3)"""
+    height = -(-main.SCREEN_HEIGHT // downsample)
+    width = -(-main.SCREEN_WIDTH // downsample)
+    return (height, width) if grayscale else (height, width, 3)
+
+
+def observation_spec(pixels=False, grayscale=True, downsample=2, frame_stack=4, **_):
+    """Форма и тип наблюдения DinoEnv с такими параметрами"""
+    if pixels:
+        return (frame_stack,) + frame_shape(grayscale, downsample), np.uint8
+    return (OBSERVATION_SIZE,), np.float32
+
+
+class PixelObserver:
+    """Кадры с поверхности игры в кольцевом буфере для стопки кадров.
+
+    Пиксели читаются представлением pygame.surfarray.pixels3d, без копии
+    экрана; единственная копия - запись уже уменьшенного кадра в буфер.
+    Уменьшение - выборка каждого downsample-го пикселя (срез представления),
+    оттенки серого считаются в целых числах по весам яркости.
+
+    Буфер хранит каждый кадр дважды (в позициях i и i + stack), поэтому
+    последние stack кадров от старого к новому всегда лежат подряд и
+    stacked() возвращает представление, а не новый массив.
+    """
+    # Веса яркости R, G, B в 1/256
+    LUMA = (77, 150, 29)
+
+    def __init__(self, surface, grayscale=True, downsample=1, stack=4):
+        self.surface = surface
+        self.grayscale = grayscale
+        self.downsample = downsample
+        self.stack = stack
+        self.frame_shape = frame_shape(grayscale, downsample)
+        self.shape = (stack,) + self.frame_shape
+        self.buffer = np.zeros((2 * stack,) + self.frame_shape, dtype=np.uint8)
+        self.index = 0
+        # Промежуточные суммы яркости в раскладке surfarray (x, y)
+        scratch_shape = self.frame_shape[1::-1]
+        self.luma = np.zeros(scratch_shape, dtype=np.uint16)
+        self.channel = np.zeros(scratch_shape, dtype=np.uint16)
+
+    @contextmanager
+    def view(self):
+        """Представление пикселей поверхности формы (ширина, высота, 3)
+
+        Пока представление живо, поверхность заблокирована и рисовать на ней
+        нельзя, поэтому его не следует хранить после выхода из блока.
+        """
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        try:
+            yield pixels
+        finally:
+            del pixels
+
+    def capture(self, fill=False):
+        """Записывает текущий кадр поверхности в буфер
+
+        fill=True заполняет этим кадром всю стопку (начало эпизода).
+        Возвращает стопку кадров.
+        """
+        frame = self.buffer[self.index]
+        step = self.downsample
+        with self.view() as pixels:
+            pixels = pixels[::step, ::step]
+            if self.grayscale:
+                luma, channel = self.luma, self.channel
+                np.multiply(pixels[..., 0], self.LUMA[0], out=luma, dtype=np.uint16)
+                for index in (1, 2):
+                    np.multiply(pixels[..., index], self.LUMA[index], out=channel, dtype=np.uint16)
+                    luma += channel
+                np.right_shift(luma.T, 8, out=frame, casting="unsafe")
+            else:
+                frame[...] = pixels.transpose(1, 0, 2)
+            del pixels
+        if fill:
+            self.buffer[:] = frame
+            self.index = 0
+        else:
+            self.buffer[self.index + self.stack] = frame
+            self.index = (self.index + 1) % self.stack
+        return self.stacked()
+
+    def stacked(self):
+        """Последние stack кадров от старого к новому (представление буфера)"""
+        return self.buffer[self.index:self.index + self.stack]
+
+
+class DinoEnv:
+    """Одна игра с интерфейсом reset/step.
+
+    frame_skip - сколько тиков игры длится один шаг с выбранным действием,
+    спокойные тики внутри шага проматываются Game.fast_forward. Награда -
+    прирост счета за шаг плюс crash_penalty при проигрыше; эпизод
+    обрезается (truncated) после max_frames тиков.
+
+    С pixels=True наблюдение - стопка из frame_stack кадров (см. PixelObserver).
+    Кадр рисуется только в конце шага и только если шаг вызван с
+    render=True; иначе отрисовка пропускается и возвращается прежняя стопка.
+    """
+    action_count = ACTION_COUNT
+
+    def __init__(self, seed=None, frame_skip=1, max_frames=100000, crash_penalty=-100.0,
+                 fast_forward=True, pixels=False, grayscale=True, downsample=2, frame_stack=4):
+        self.game = main.Game(headless=True, seed=seed)
+        self.observation_shape, self.observation_dtype = observation_spec(
+            pixels, grayscale, downsample, frame_stack)
+        self.pixels = None
+        if pixels:
+            self.pixels = PixelObserver(self.game.screen, grayscale, downsample, frame_stack)
+        self.seed = seed
+        self.frame_skip = frame_skip
+        self.max_frames = max_frames
+        self.crash_penalty = crash_penalty
+        self.fast_forward = fast_forward
+        self.observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        self.jump_held = False
+        self.episode_frames = 0
+        self.episodes = 0
+
+    def reset(self, seed=None, out=None):
+        """Начинает эпизод, возвращает (наблюдение, info)
+
+        Без зерна эпизоды продолжают последовательность исходного зерна.
+        """
+        if seed is None and self.seed is not None:
+            seed = self.seed + self.episodes
+        self.game.reset_episode(seed)
+        self.jump_held = False
+        self.episode_frames = 0
+        self.episodes += 1
+        if self.pixels is not None:
+            self.game.draw()
+            return self.output(self.pixels.capture(fill=True), out), self.info()
+        return observe(self.game, self.observation if out is None else out), self.info()
+
+    def step(self, action, out=None, render=True):
+        """Применяет действие, возвращает (наблюдение, награда, terminated, truncated, info)
+
+        render=False пропускает отрисовку кадра в режиме pixels.
+        """
+        game = self.game
+        held = action == ACTION_JUMP
+        if held != self.jump_held:
+            game.perform_action(main.ACTION_JUMP_PRESS if held else main.ACTION_JUMP_RELEASE)
+            self.jump_held = held
+
+        score = game.score
+        ticks = 0
+        while ticks < self.frame_skip and not game.dino.is_crashed:
+            if self.fast_forward:
+                skipped = game.fast_forward(self.frame_skip - ticks)
+                if skipped:
+                    ticks += skipped
+                    continue
+            game.step()
+            ticks += 1
+        self.episode_frames += ticks
+
+        terminated = game.dino.is_crashed
+        truncated = not terminated and self.episode_frames >= self.max_frames
+        reward = float(game.score - score)
+        if terminated:
+            reward += self.crash_penalty
+        if self.pixels is None:
+            observation = observe(game, self.observation if out is None else out)
+        elif render:
+            game.draw()
+            observation = self.output(self.pixels.capture(), out)
+        else:
+            observation = self.output(self.pixels.stacked(), out)
+        return observation, reward, terminated, truncated, self.info()
+
+    @staticmethod
+    def output(stacked, out):
+        """Стопка кадров как есть или ее копия в out"""
+        if out is None:
+            return stacked
+        out[...] = stacked
+        return out
+
+    def info(self):
+        return {
+            "score": self.game.score,
+            "frames": self.episode_frames,
+            "crash_cause": self.game.crash_cause,
+        }
+
+
+class VectorDinoEnv:
+    """K окружений в одном процессе, шагающих за один вызов.
+
+    Результаты пишутся в общие массивы observations, rewards, terminated,
+    truncated и scores (счет на момент конца шага, до автоматического
+    перезапуска). Закончившиеся эпизоды сразу перезапускаются, и в
+    observations попадает первое наблюдение нового эпизода.
+    """
+    def __init__(self, count, seed=None, buffers=None, **env_kwargs):
+        self.count = count
+        self.envs = [
+            DinoEnv(seed=None if seed is None else seed + index * 1000003, **env_kwargs)
+            for index in range(count)
+        ]
+        if buffers is None:
+            buffers = allocate_buffers(count, spec=observation_spec(**env_kwargs))
+        (self.observations, self.rewards, self.terminated,
+         self.truncated, self.scores) = buffers
+
+    def reset(self, seeds=None):
+        for index, env in enumerate(self.envs):
+            env.reset(None if seeds is None else seeds[index], out=self.observations[index])
+        self.rewards[:] = 0
+        self.terminated[:] = False
+        self.truncated[:] = False
+        self.scores[:] = 0
+        return self.observations
+
+    def step(self, actions, render=True):
+        """Шаг всех окружений, возвращает (наблюдения, награды, terminated, truncated, счета)"""
+        observations = self.observations
+        for index, env in enumerate(self.envs):
+            _, reward, terminated, truncated, _ = env.step(
+                actions[index], out=observations[index], render=render)
+            self.rewards[index] = reward
+            self.terminated[index] = terminated
+            self.truncated[index] = truncated
+            self.scores[index] = env.game.score
+            if terminated or truncated:
+                env.reset(out=observations[index])
+        return observations, self.rewards, self.terminated, self.truncated, self.scores
+
+    def close(self):
+        pass
+
+
+def buffer_shapes(count, spec):
+    observation_shape, observation_dtype = spec
+    return [
+        ((count,) + observation_shape, observation_dtype),
+        ((count,), np.float32),
+        ((count,), np.bool_),
+        ((count,), np.bool_),
+        ((count,), np.int64),
+    ]
+
+
+def allocate_buffers(count, memory=None, spec=observation_spec()):
+    """Массивы результатов для count окружений (поверх memory, если передана)"""
+    shapes = buffer_shapes(count, spec)
+    if memory is None:
+        return tuple(np.zeros(shape, dtype=dtype) for shape, dtype in shapes)
+    buffers = []
+    offset = 0
+    for shape, dtype in shapes:
+        array = np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+        buffers.append(array)
+        offset += array.nbytes
+    return tuple(buffers)
+
+
+def buffers_size(count, spec=observation_spec()):
+    return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize
+               for shape, dtype in buffer_shapes(count, spec))
+
+
+def _worker(conn, memory_name, actions_name, total, start, count, seed, env_kwargs):
+    """Процесс с частью окружений: пишет результаты в свой срез общей памяти"""
+    memory = shared_memory.SharedMemory(name=memory_name)
+    actions_memory = shared_memory.SharedMemory(name=actions_name)
+    try:
+        spec = observation_spec(**env_kwargs)
+        buffers = tuple(array[start:start + count]
+                        for array in allocate_buffers(total, memory, spec))
+        actions = np.ndarray((total,), dtype=np.int8, buffer=actions_memory.buf)[start:start + count]
+        envs = VectorDinoEnv(count, seed=seed, buffers=buffers, **env_kwargs)
+        conn.send("ready")
+        while True:
+            command, payload = conn.recv()
+            if command == "step":
+                envs.step(actions, payload)
+            elif command == "reset":
+                envs.reset(payload)
+            elif command == "close":
+                break
+            conn.send("ok")
+    finally:
+        del buffers, actions
+        memory.close()
+        actions_memory.close()
+        conn.close()
+
+
+class SubprocVectorEnv:
+    """K окружений, разделенных между процессами.
+
+    Каждый процесс ведет свою часть окружений в VectorDinoEnv. Действия и
+    результаты передаются через разделяемую память, по каналу идет только
+    короткая команда на процесс за шаг.
+    """
+    def __init__(self, count, workers=None, seed=None, **env_kwargs):
+        self.count = count
+        workers = max(1, min(count, workers or os.cpu_count() or 1))
+        spec = observation_spec(**env_kwargs)
+        self.memory = shared_memory.SharedMemory(create=True, size=buffers_size(count, spec))
+        self.actions_memory = shared_memory.SharedMemory(create=True, size=count)
+        (self.observations, self.rewards, self.terminated,
+         self.truncated, self.scores) = allocate_buffers(count, self.memory, spec)
+        self.actions = np.ndarray((count,), dtype=np.int8, buffer=self.actions_memory.buf)
+
+        self.connections = []
+        self.processes = []
+        bounds = np.linspace(0, count, workers + 1).astype(int)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            parent, child = mp.Pipe()
+            worker_seed = None if seed is None else seed + int(start) * 1000003
+            process = mp.Process(
+                target=_worker, daemon=True,
+                args=(child, self.memory.name, self.actions_memory.name, count,
+                      int(start), int(end - start), worker_seed, env_kwargs),
+            )
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        for connection in self.connections:
+            connection.recv()
+        self.bounds = bounds
+
+    def broadcast(self, command, payloads=None):
+        for index, connection in enumerate(self.connections):
+            connection.send((command, None if payloads is None else payloads[index]))
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self, seeds=None):
+        payloads = None
+        if seeds is not None:
+            payloads = [list(seeds[start:end]) for start, end in zip(self.bounds[:-1], self.bounds[1:])]
+        self.broadcast("reset", payloads)
+        return self.observations
+
+    def step(self, actions, render=True):
+        """Шаг всех окружений, возвращает (наблюдения, награды, terminated, truncated, счета)"""
+        self.actions[:] = actions
+        self.broadcast("step", [render] * len(self.connections))
+        return self.observations, self.rewards, self.terminated, self.truncated, self.scores
+
+    def close(self):
+        if self.memory is None:
+            return
+        for connection in self.connections:
+            connection.send(("close", None))
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        # Представления поверх разделяемой памяти нужно убрать до ее закрытия
+        del self.observations, self.rewards, self.terminated, self.truncated, self.scores, self.actions
+        for memory in (self.memory, self.actions_memory):
+            memory.close()
+            memory.unlink()
+        self.memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def make_vector_env(count, workers=0, seed=None, **env_kwargs):
+    """VectorDinoEnv при workers=0, иначе SubprocVectorEnv"""
+    if workers:
+        return SubprocVectorEnv(count, workers, seed=seed, **env_kwargs)
+    return VectorDinoEnv(count, seed=seed, **env_kwargs)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Скорость окружения со случайной политикой")
+    parser.add_argument("--envs", type=int, default=16, help="количество окружений")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="процессов (0 - все окружения в текущем процессе)")
+    parser.add_argument("--steps", type=int, default=2000, help="шагов на окружение")
+    parser.add_argument("--frame-skip", type=int, default=4, help="тиков игры на шаг")
+    parser.add_argument("--seed", type=int, default=0, help="зерно игр и политики")
+    parser.add_argument("--pixels", action="store_true", help="наблюдение - стопка кадров экрана")
+    parser.add_argument("--downsample", type=int, default=2, help="уменьшение кадра в N раз")
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="рисовать кадр на каждом N-м шаге (только с --pixels)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    vector_env = make_vector_env(args.envs, args.workers, seed=args.seed, frame_skip=args.frame_skip,
+                                 pixels=args.pixels, downsample=args.downsample)
+    try:
+        vector_env.reset()
+        episodes = 0
+        started = time.perf_counter()
+        for step in range(args.steps):
+            # Случайная политика: прыжок удерживается примерно каждый десятый шаг
+            actions = (rng.random(args.envs) < 0.1).astype(np.int8)
+            render = step % args.render_every == 0
+            _, _, terminated, truncated, _ = vector_env.step(actions, render)
+            episodes += int(terminated.sum() + truncated.sum())
+        elapsed = time.perf_counter() - started
+    finally:
+        vector_env.close()
+    steps = args.envs * args.steps
+    print(f"Окружений: {args.envs}, процессов: {args.workers}, шагов: {steps}, "
+          f"эпизодов: {episodes}, {elapsed:.2f} с")
+    print(f"{steps / elapsed:.0f} шагов/с, {steps * args.frame_skip / elapsed:.0f} тиков/с")
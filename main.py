@@ -1,61 +1,177 @@
+import time
+# Начало импорта модуля: время импорта попадает в отчет о старте
+_import_started = time.perf_counter()
 import pygame
 import random
 import os
+import math
 from PIL import Image
 import io
-import cairosvg
-
-# Инициализация pygame
-pygame.init()
+import sys
+import threading
+import argparse
+import struct
+import csv
+import json
+from collections import deque, namedtuple
+import hashlib
+import bisect
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Инициализация pygame: для загрузки спрайтов и шрифтов хватает дисплея и
+# шрифтов, звук включает окно игры через init_window
+pygame.display.init()
 pygame.font.init()
-pygame.mixer.init()  # Инициализация звуковой подсистемы
 
 # Константы
 SCREEN_WIDTH = 700
 SCREEN_HEIGHT = 200
-FPS = 60
+FPS = 60  # Частота тиков симуляции
+TICK_MS = 1000 / FPS
+# После зависания окна догоняем не больше этого времени, остальное теряется
+MAX_FRAME_MS = 250
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Растеризованные SVG хранятся вне папки проекта
+RASTER_CACHE_DIR = os.environ.get("DINO_CACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "chrome-dino", "raster"
+)
+
+# Путь PNG в проекте -> актуальный растр из кэша
+raster_paths = {}
+
+# Длительность фаз старта в секундах (в порядке прохождения)
+startup_times = OrderedDict()
+
+def record_startup(phase, started):
+    """Запоминает длительность фазы старта, начатой в started (perf_counter)"""
+    startup_times[phase] = time.perf_counter() - started
+
+def startup_report():
+    return ", ".join(f"{phase} {seconds * 1000:.1f} мс" for phase, seconds in startup_times.items())
+
+_cairosvg = None
+_cairosvg_error = None
+
+def get_cairosvg():
+    """Импортирует cairosvg только когда действительно нужна растеризация"""
+    global _cairosvg, _cairosvg_error
+    if _cairosvg is None:
+        # Неудачный импорт (нет libcairo) не повторяем: он медленный
+        if _cairosvg_error is not None:
+            raise _cairosvg_error
+        try:
+            import cairosvg
+        except (ImportError, OSError) as e:
+            _cairosvg_error = e
+            raise
+        _cairosvg = cairosvg
+    return _cairosvg
+
+def raster_cache_path(svg_path, width, height, cache_dir=None):
+    """Путь растра в кэше: ключ - хэш содержимого SVG и целевой размер"""
+    with open(svg_path, "rb") as f:
+        digest = hashlib.sha256(f.read())
+    digest.update(f"{width}x{height}".encode())
+    name = os.path.splitext(os.path.basename(svg_path))[0]
+    return os.path.join(cache_dir or RASTER_CACHE_DIR, f"{name}-{digest.hexdigest()[:16]}.png")
 
 def convert_svg_to_png(svg_path, png_path, width, height):
-    """Конвертирует SVG в PNG"""
-    if not os.path.exists(png_path):
-        cairosvg.svg2png(
-            url=svg_path,
-            write_to=png_path,
-            output_width=width,
-            output_height=height
-        )
-
-def initialize_images():
-    """Конвертирует все необходимые SVG в PNG с правильными размерами из main.js"""
+    """Конвертирует SVG в PNG (запись через временный файл, чтобы не оставить битый PNG)"""
+    tmp_path = f"{png_path}.{os.getpid()}.tmp"
+    get_cairosvg().svg2png(
+        url=svg_path,
+        write_to=tmp_path,
+        output_width=width,
+        output_height=height
+    )
+    os.replace(tmp_path, png_path)
+
+def initialize_images(cache_dir=None, max_workers=None):
+    """Растеризует SVG с правильными размерами из main.js в кэш
+
+    Свежесть определяется хэшем содержимого SVG и размером, поэтому
+    измененные SVG и размеры растеризуются заново, а теплый старт
+    ограничивается чтением SVG. Недостающие растры строятся в пуле потоков.
+    Если cairosvg недоступен, используются PNG из папки images.
+    """
     image_conversions = [
-        ("images/dino_walk_1.svg", "images/dino_walk_1.png", 40, 43),  # Обновленная высота
-        ("images/dino_walk_2.svg", "images/dino_walk_2.png", 40, 43),  # Обновленная высота
-        ("images/dino_crash.svg", "images/dino_crash.png", 40, 43),    # Обновленная высота
+        ("dino_walk_1", 40, 43),  # Обновленная высота
+        ("dino_walk_2", 40, 43),  # Обновленная высота
+        ("dino_crash", 40, 43),    # Обновленная высота
         # Размеры кактуса теперь будут определяться динамически
-        ("images/obstical_cactus.svg", "images/obstical_cactus.png", 20, 40),  # Обновленные размеры
-        ("images/cloud.svg", "images/cloud.png", 60, 25),
-        ("images/land_normal.svg", "images/land_normal.png", 100, 5),
-        ("images/land_bump.svg", "images/land_bump.png", 60, 12),
-        ("images/game_over.svg", "images/game_over.png", 250, 15),  # Исправленные размеры
-        ("images/reset.svg", "images/reset.png", 40, 40),
-        ("images/ptero_fly1.svg", "images/ptero_fly1.png", 40, 35),  # Обновленные размеры
-        ("images/ptero_fly2.svg", "images/ptero_fly2.png", 40, 35),  # Обновленные размеры
+        ("obstical_cactus", 20, 40),  # Обновленные размеры
+        ("cloud", 60, 25),
+        ("land_normal", 100, 5),
+        ("land_bump", 60, 12),
+        ("game_over", 250, 15),  # Исправленные размеры
+        ("reset", 40, 40),
+        ("ptero_fly1", 40, 35),  # Обновленные размеры
+        ("ptero_fly2", 40, 35),  # Обновленные размеры
     ]
-    
-    # Создаем папку images если её нет
-    if not os.path.exists("images"):
-        os.makedirs("images")
-    
-    for svg_path, png_path, width, height in image_conversions:
-        if os.path.exists(svg_path):
-            convert_svg_to_png(svg_path, png_path, width, height)
+    cache_dir = cache_dir or RASTER_CACHE_DIR
+
+    pending = []
+    for name, width, height in image_conversions:
+        svg_path = os.path.join(BASE_DIR, "images", name + ".svg")
+        if not os.path.exists(svg_path):
+            continue
+        png_path = os.path.join(BASE_DIR, "images", name + ".png")
+        cached_path = raster_cache_path(svg_path, width, height, cache_dir)
+        if os.path.exists(cached_path):
+            raster_paths[png_path] = cached_path
+        else:
+            pending.append((svg_path, png_path, cached_path, width, height))
+
+    if not pending:
+        return raster_paths
+
+    try:
+        get_cairosvg()
+    except (ImportError, OSError) as e:
+        reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+        print(f"cairosvg недоступен, используются готовые PNG: {reason}")
+        return raster_paths
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(convert_svg_to_png, svg_path, cached_path, width, height): (png_path, cached_path)
+            for svg_path, png_path, cached_path, width, height in pending
+        }
+        for future, (png_path, cached_path) in futures.items():
+            try:
+                future.result()
+                raster_paths[png_path] = cached_path
+            except Exception as e:
+                print(f"Ошибка растеризации {png_path}: {e}")
+    return raster_paths
+
+_images_lock = threading.Lock()
+_images_ready = False
+
+def ensure_images():
+    """initialize_images один раз за процесс, перед первой загрузкой спрайта"""
+    global _images_ready
+    with _images_lock:
+        if not _images_ready:
+            started = time.perf_counter()
+            initialize_images()
+            _images_ready = True
+            record_startup("images", started)
 
 def load_image(path, width, height):
     """Загружает изображение и масштабирует его"""
     try:
         # Проверяем, существует ли PNG версия
         png_path = os.path.splitext(path)[0] + ".png"
-        if (os.path.exists(png_path)):
+        if png_path in raster_paths:
+            # Свежий растр SVG из кэша
+            path = raster_paths[png_path]
+        elif (os.path.exists(png_path)):
             path = png_path
         
         image = pygame.image.load(path)
@@ -67,15 +183,273 @@ def load_image(path, width, height):
         surface.fill((255, 0, 0))  # Заполняем красным для отладки
         return surface
 
-# Конвертируем все изображения при запуске
-initialize_images()
+class AssetRegistry:
+    """Общий реестр изображений процесса.
+
+    Каждая пара (путь, размер) читается с диска и масштабируется один раз,
+    после чего поверхность разделяется всеми объектами, которым она нужна.
+    Рядом хранятся маски столкновений этих поверхностей.
+    """
+    def __init__(self):
+        self.surfaces = {}
+        self.masks = {}  # id(поверхности) -> (поверхность, маска)
+        # Декодированные в фоне поверхности, еще не прошедшие convert_alpha
+        self.preloaded = {}
+        self.hits = 0
+        self.misses = 0
+
+    def preload(self, entries):
+        """Читает и масштабирует пары (путь, ширина, высота) заранее
+
+        Вызывается из потока загрузки: convert_alpha и маска делаются
+        потом в get, в основном потоке.
+        """
+        ensure_images()
+        for path, width, height in entries:
+            key = (path, width, height)
+            if key not in self.surfaces and key not in self.preloaded:
+                self.preloaded[key] = load_image(path, width, height)
+
+    def get(self, path, width, height):
+        """Возвращает общую поверхность для (path, width, height)"""
+        key = (path, width, height)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.preloaded.pop(key, None)
+        if surface is None:
+            ensure_images()
+            surface = load_image(path, width, height)
+        # convert_alpha доступен только после создания окна
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.surfaces[key] = surface
+        self.mask(surface)
+        return surface
+
+    def mask(self, surface):
+        """Маска столкновений поверхности (кадра спрайта), считается один раз"""
+        entry = self.masks.get(id(surface))
+        if entry is None:
+            # Поверхность хранится вместе с маской, чтобы id не переиспользовался
+            entry = (surface, pygame.mask.from_surface(surface))
+            self.masks[id(surface)] = entry
+        return entry[1]
+
+    def get_mask(self, path, width, height):
+        return self.mask(self.get(path, width, height))
+
+    def stats(self):
+        """Статистика попаданий в реестр"""
+        return {"entries": len(self.surfaces), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self.surfaces.clear()
+        self.masks.clear()
+        self.preloaded.clear()
+        self.hits = 0
+        self.misses = 0
+
+# Общий реестр изображений
+assets = AssetRegistry()
+
+class NullSound:
+    """Заглушка звука для режима без аудио"""
+    def play(self, *args, **kwargs):
+        return None
+
+class BankSound:
+    """Декодированный звук, играющий в своем зарезервированном канале"""
+    def __init__(self, sound, channel):
+        self.sound = sound
+        self.channel = channel
+
+    def play(self):
+        # Повторный звук того же типа прерывает предыдущий, как в Chrome
+        self.channel.play(self.sound)
+
+class SoundBank:
+    """Звуки игры: каждый файл декодируется один раз за процесс
+
+    Под каждый звук резервируется свой канал микшера, поэтому звуки разных
+    типов не вытесняют друг друга. Пока банк не открыт (headless и пакетные
+    прогоны), микшер не инициализируется и get возвращает NullSound.
+    """
+    def __init__(self, paths):
+        self.paths = paths
+        self.sounds = {}
+        self.channels = {}
+
+    def open(self):
+        """Инициализирует микшер и резервирует каналы, False - звука нет"""
+        if self.channels:
+            return True
+        if pygame.mixer.get_init() is None:
+            try:
+                # Маленький буфер - меньше задержка между прыжком и звуком
+                pygame.mixer.init(buffer=512)
+            except pygame.error as e:
+                # На сервере без звуковой карты игра работает без звука
+                print(f"Звук недоступен: {e}")
+                return False
+        names = list(self.paths)
+        if pygame.mixer.get_num_channels() < len(names):
+            pygame.mixer.set_num_channels(len(names))
+        pygame.mixer.set_reserved(len(names))
+        for index, name in enumerate(names):
+            self.channels[name] = pygame.mixer.Channel(index)
+        return True
+
+    def preload(self):
+        """Декодирует все звуки открытого банка заранее (из потока загрузки)"""
+        for name in self.paths:
+            self.get(name)
+
+    def get(self, name, enabled=True):
+        """Звук по имени или заглушка, если звук выключен или банк не открыт"""
+        if not enabled or not self.channels:
+            return NullSound()
+        sound = self.sounds.get(name)
+        if sound is None:
+            sound = BankSound(pygame.mixer.Sound(self.paths[name]), self.channels[name])
+            self.sounds[name] = sound
+        return sound
+
+# Общий банк звуков
+sounds = SoundBank({
+    name: os.path.join(BASE_DIR, "sounds", f"{name}.wav")
+    for name in ("jump", "point", "die")
+})
+
+def init_window(audio=True):
+    """Инициализирует подсистемы pygame для игры в окне
+
+    Нужны только дисплей, шрифты и, если звук включен, микшер: pygame.init
+    поднял бы все модули, включая микшер. Повторный вызов ничего не делает.
+    Возвращает, доступен ли звук.
+    """
+    pygame.display.init()
+    pygame.font.init()
+    return audio and sounds.open()
+
+FONT_PATH = os.path.join(BASE_DIR, "fonts", "arcade_font.TTF")
+_fonts = None
+
+def load_fonts():
+    """Шрифты счета и debug информации (загружаются один раз)"""
+    global _fonts
+    if _fonts is None:
+        if os.path.exists(FONT_PATH):
+            _fonts = (pygame.font.Font(FONT_PATH, 8),  # для счета
+                      pygame.font.Font(FONT_PATH, 8))  # для debug информации
+        else:
+            print("Шрифт не найден, использую стандартный")
+            _fonts = (pygame.font.Font(None, 36), pygame.font.Font(None, 36))
+    return _fonts
+
+def invert_surface_keeping_alpha(surface):
+    """Инвертирует цвета спрайта, сохраняя прозрачность
+
+    Непрозрачные пиксели становятся белыми с исходной альфой, прозрачные -
+    (0, 0, 0, 0). Делается операциями над поверхностью, без обхода пикселей.
+    """
+    inv = pygame.Surface(surface.get_rect().size, pygame.SRCALPHA)
+    inv.blit(surface, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+    # Белый цвет при сохранении альфа-канала
+    inv.fill((255, 255, 255, 0), special_flags=pygame.BLEND_RGB_MAX)
+    # Обнуляем цвет полностью прозрачных пикселей
+    opaque = pygame.mask.from_surface(surface, 0).to_surface(
+        setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 0)
+    )
+    inv.blit(opaque, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return inv
+
+class NightTintCache:
+    """Кэш ночных версий спрайтов.
+
+    Инвертированная версия строится один раз на исходную поверхность,
+    смешанная - один раз на пару (поверхность, уровень перехода).
+    Уровень перехода квантуется до levels шагов, размер кэша ограничен
+    max_entries с вытеснением давно не использованных записей.
+    """
+    def __init__(self, levels=50, max_entries=512):
+        self.levels = levels
+        self.max_entries = max_entries
+        # id(поверхности) -> (поверхность, инвертированная версия)
+        self.inverted = OrderedDict()
+        # (id(поверхности), уровень) -> (поверхность, ночная версия)
+        self.tinted = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, progress):
+        """Переводит прогресс перехода 0..1 в целый уровень"""
+        return max(0, min(self.levels, int(round(progress * self.levels))))
+
+    def get_inverted(self, surface):
+        """Возвращает инвертированную версию спрайта из кэша"""
+        key = id(surface)
+        entry = self.inverted.get(key)
+        # Храним ссылку на исходник, чтобы id не переиспользовался
+        if entry is not None and entry[0] is surface:
+            self.inverted.move_to_end(key)
+            return entry[1]
+        inverted = invert_surface_keeping_alpha(surface)
+        self.inverted[key] = (surface, inverted)
+        self._evict(self.inverted)
+        return inverted
+
+    def get(self, surface, progress):
+        """Возвращает ночную версию спрайта для текущего прогресса"""
+        level = self.quantize(progress)
+        if level == 0:
+            return surface
+
+        key = (id(surface), level)
+        entry = self.tinted.get(key)
+        if entry is not None and entry[0] is surface:
+            self.tinted.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        # Создаем копию с сохранением альфа-канала
+        result = surface.copy()
+        # Берем инвертированную версию с сохранением прозрачности
+        night_surface = self.get_inverted(surface)
+        # Устанавливаем прозрачность для плавного перехода
+        night_surface.set_alpha(int(255 * level / self.levels))
+        # Накладываем ночной эффект
+        result.blit(night_surface, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+
+        self.tinted[key] = (surface, result)
+        self._evict(self.tinted)
+        return result
+
+    def invalidate(self, surface):
+        """Забывает ночные версии поверхности, содержимое которой изменилось"""
+        key = id(surface)
+        self.inverted.pop(key, None)
+        for level in range(1, self.levels + 1):
+            self.tinted.pop((key, level), None)
+
+    def _evict(self, cache):
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def clear(self):
+        self.inverted.clear()
+        self.tinted.clear()
 
 class GameObject:
     def __init__(self, x, y, width, height, image_path):
         self.rect = pygame.Rect(x, y, width, height)
-        self.image = load_image(image_path, width, height)
+        self.image = assets.get(image_path, width, height)
         self.velocity = 0
-        
+
     def update(self, dt):
         """Обновление состояния объекта"""
         pass  # Базовый класс не требует обновления
@@ -83,29 +457,294 @@ class GameObject:
     def draw(self, screen):
         screen.blit(self.image, self.rect)
 
-class Dino(GameObject):
-    def __init__(self):
+class JumpBody:
+    """Физика прыжка динозавра без спрайтов и звука.
+
+    Параметры физики - атрибуты класса, поэтому таблицу прыжков можно
+    строить по самому классу (get_jump_table(Dino)) в любом потоке, не
+    создавая спрайтов. Dino наследует отсюда начало прыжка и шаг move,
+    так что JumpTable проигрывает ту же физику, что и игра.
+    """
+    width = 40
+    height = 43
+    gravity = 0.6
+    min_jump_velocity = -6  # Уменьшили начальную скорость прыжка с -6 до -5
+    max_jump_velocity = -8  # Уменьшили максимальную скорость прыжка с -9 до -7
+    max_jump_time = 150  # Уменьшили время удержания с 200 до 150
+
+    def __init__(self, physics=None):
+        if physics is not None:
+            for name in JUMP_PHYSICS:
+                setattr(self, name, getattr(physics, name))
+        self.rect = pygame.Rect(10, SCREEN_HEIGHT - self.height, self.width, self.height)
+        self.velocity = 0
+        self.is_jumping = False
+        self.is_jump_pressed = False
+        self.jump_time = 0
+
+    def launch(self, power):
+        """Отрыв от земли с начальной скоростью power; False - прыжок уже идет"""
+        if self.is_jumping or self.rect.bottom < SCREEN_HEIGHT:
+            return False
+        self.is_jumping = True
+        self.is_jump_pressed = True
+        self.jump_time = 0
+        self.velocity = power
+        return True
+
+    def move(self, dt):
+        """Один тик прыжка: удержание, гравитация и приземление"""
+        if self.is_jumping and self.is_jump_pressed:
+            self.jump_time += dt * 1000  # Переводим в миллисекунды
+            if self.jump_time <= self.max_jump_time and self.velocity > self.max_jump_velocity:
+                # Уменьшили коэффициент усиления с 3 до 2
+                self.velocity = max(
+                    self.max_jump_velocity,
+                    self.min_jump_velocity - (self.jump_time / self.max_jump_time) * 2
+                )
+
+        # Гравитация
+        self.velocity += self.gravity
+        self.rect.y += self.velocity
+
+        # Ограничение по земле
+        if self.rect.bottom > SCREEN_HEIGHT:
+            self.rect.bottom = SCREEN_HEIGHT
+            self.velocity = 0
+            self.is_jumping = False
+            self.is_jump_pressed = False
+            self.jump_time = 0
+
+    def stop_jump(self):
+        """Окончание прыжка при отпускании кнопки"""
+        self.is_jump_pressed = False
+
+# Параметры физики прыжка: по ним различаются таблицы прыжков
+JUMP_PHYSICS = ('width', 'height', 'gravity', 'min_jump_velocity', 'max_jump_velocity', 'max_jump_time')
+
+# Коэффициенты эвристики автопилота (Dino.should_jump и Dino.calculate_jump_power)
+DEFAULT_JUMP_MULTIPLIERS = {
+    'low_ptero_distance': 1.2,   # Дистанция прыжка для низких птеродактилей
+    'high_ptero_distance': 1.4,  # Дистанция прыжка для высоких птеродактилей
+    'near_power': 1.2,           # Сила прыжка для близких препятствий
+    'high_ptero_power': 1.2,     # Сила прыжка для высоких птеродактилей
+    'tall_cactus_power': 1.15,   # Сила прыжка для высоких кактусов
+}
+
+# Стратегии автопилота: таблицы траекторий или исходная эвристика
+AUTOPILOT_STRATEGIES = ('table', 'heuristic')
+
+class JumpTable:
+    """Предрасчитанные траектории прыжка для автопилота.
+
+    Каждый вариант прыжка (начальная скорость, время удержания) один раз
+    проигрывается настоящим Dino.update с шагом frame_ms. Для объекта,
+    заданного ключом (сдвиг за тик относительно динозавра, верх, низ,
+    ширина), по траектории строятся промежутки дистанций, с которых прыжок
+    проходит объект без пересечения прямоугольников. Сдвиг проверяется и на
+    пиксель больше, так как скорость игры за прыжок немного растет.
+    По промежуткам для каждой дистанции выбирается лучший вариант, поэтому
+    решение автопилота сводится к поиску по таблице.
+
+    Планы и маски проходящих вариантов для всех объектов, которые может
+    выставить Course (course_keys), строятся сразу в конструкторе, так что
+    на тике автопилота остаются только обращения к таблицам.
+    """
+    POWERS = [-5 - 0.5 * i for i in range(11)]  # Диапазон calculate_jump_power
+    MAX_HOLD_TICKS = 12
+    # Размеры объектов трассы (Course) и диапазон скоростей игры
+    CACTUS_SIZE = (20, 40)
+    PTERODACTYL_SIZE = (40, 35)
+    SPEEDS = (4, 8)
+
+    def __init__(self, physics, frame_ms=1000 / FPS):
+        self.frame_ms = frame_ms
+        self.dino_width = physics.width
+        self.dino_height = physics.height
+        self.ground_y = SCREEN_HEIGHT - physics.height
+        # Варианты прыжка: (сила, длительность удержания в мс, y по тикам до приземления)
+        self.options = []
+        seen = set()
+        for power in self.POWERS:
+            for hold in range(1, self.MAX_HOLD_TICKS + 1):
+                # Удержание отпускается после hold-го тика (jump_time >= duration)
+                duration = (hold - 0.5) * frame_ms
+                trajectory = self.trajectory(physics, power, duration)
+                if trajectory not in seen:
+                    seen.add(trajectory)
+                    self.options.append((power, duration, trajectory))
+        self.max_airtime = max(len(option[2]) for option in self.options)
+        # Варианты по возрастанию времени полета: бит i маски - вариант by_airtime[i]
+        self.by_airtime = sorted(range(len(self.options)), key=lambda index: len(self.options[index][2]))
+        self.gaps = {}   # ключ объекта -> промежутки безопасных дистанций по вариантам
+        self.plans = {}  # ключ объекта -> лучший (оценка, вариант) по дистанции
+        self.masks = {}  # ключ объекта -> (первая дистанция, маски проходящих вариантов)
+        for key in self.course_keys():
+            self.clearing(key)
+            if key[3] == self.CACTUS_SIZE[0]:
+                self.plan(key)
+
+    def trajectory(self, physics, power, duration):
+        """Позиции динозавра по тикам прыжка, как их дает Game.update с автопилотом"""
+        body = JumpBody(physics)
+        body.launch(power)
+        positions = []
+        while body.is_jumping:
+            body.move(self.frame_ms / 1000.0)
+            if body.is_jumping and body.jump_time >= duration:
+                body.stop_jump()
+            positions.append(body.rect.y)
+        return tuple(positions)
+
+    @staticmethod
+    def key(rect, shift):
+        return (shift, rect.top, rect.bottom, rect.width)
+
+    def course_keys(self):
+        """Ключи всех объектов трассы при любой скорости игры из SPEEDS"""
+        cactus_width, cactus_height = self.CACTUS_SIZE
+        ptero_width, ptero_height = self.PTERODACTYL_SIZE
+        keys = []
+        for shift in range(scroll_shift(self.SPEEDS[0]), scroll_shift(self.SPEEDS[1]) + 1):
+            keys.append((shift, SCREEN_HEIGHT - cactus_height, SCREEN_HEIGHT, cactus_width))
+            for y in Pterodactyl.heights:
+                keys.append((shift + Pterodactyl.speed, y, y + ptero_height, ptero_width))
+        return keys
+
+    def reach(self, shift):
+        """Дальше этой дистанции ни один вариант не успевает долететь до объекта"""
+        return (self.max_airtime + 1) * (shift + 1)
+
+    def option_gaps(self, key):
+        """Промежутки [от, до] безопасных дистанций для каждого варианта прыжка"""
+        gaps = self.gaps.get(key)
+        if gaps is not None:
+            return gaps
+        shift, top, bottom, width = key
+        span = self.dino_width + width
+        grounded_hit = top < self.ground_y + self.dino_height and self.ground_y < bottom
+        gaps = []
+        for _, _, trajectory in self.options:
+            # Дистанция d опасна на тике k, если объект на d - k*shift пересекает
+            # динозавра по x, а по y динозавр в этот тик задевает объект
+            unsafe = []
+            for step in (shift, shift + 1):
+                for tick, y in enumerate(trajectory, 1):
+                    if y < bottom and top < y + self.dino_height:
+                        unsafe.append((tick * step - span + 1, tick * step - 1))
+                if grounded_hit:
+                    # После приземления объект, задевающий стоящего динозавра, опасен всегда
+                    unsafe.append(((len(trajectory) + 1) * step - span + 1, math.inf))
+            unsafe.sort()
+            option = []
+            low = -span + 1  # Объект левее уже прошел динозавра
+            for start, end in unsafe:
+                if start > low:
+                    option.append((low, start - 1))
+                low = max(low, end + 1)
+            if low < math.inf:
+                option.append((low, math.inf))
+            gaps.append(option)
+        self.gaps[key] = gaps
+        return gaps
+
+    def plan(self, key):
+        """Лучший вариант для каждой дистанции 0..N до объекта и ближайшая проходимая дистанция
+
+        В списке по дистанции лежит (оценка, вариант) или None, если прыжок
+        с нее не проходит объект. Оценка варианта: запас до края промежутка
+        (больше сдвига за тик он не нужен), затем более короткий полет,
+        чтобы раньше приземлиться.
+        """
+        cached = self.plans.get(key)
+        if cached is not None:
+            return cached
+        shift = key[0]
+        plan = [None] * (self.reach(shift) + 1)
+        for index, option in enumerate(self.option_gaps(key)):
+            airtime = len(self.options[index][2])
+            for low, high in option:
+                for distance in range(max(0, low), int(min(high, len(plan) - 1)) + 1):
+                    score = (min(distance - low, high - distance, shift), -airtime)
+                    best = plan[distance]
+                    if best is None or score > best[0]:
+                        plan[distance] = (score, index)
+        closest = next((distance for distance, entry in enumerate(plan) if entry is not None), -1)
+        self.plans[key] = plan, closest
+        return plan, closest
+
+    def clearing(self, key):
+        """Маски вариантов, проходящих объект, по дистанциям от первой до reach
+
+        Дальше reach картина не меняется, ближе первой дистанции объект
+        уже прошел динозавра и в промежутки не входит.
+        """
+        cached = self.masks.get(key)
+        if cached is not None:
+            return cached
+        shift, width = key[0], key[3]
+        first = 1 - self.dino_width - width
+        size = self.reach(shift) - first + 1
+        gaps = self.option_gaps(key)
+        clear = np.zeros((len(self.options), size), dtype=bool)
+        for bit, index in enumerate(self.by_airtime):
+            for low, high in gaps[index]:
+                clear[bit, max(low, first) - first:int(min(high, first + size - 1)) - first + 1] = True
+        packed = np.packbits(clear, axis=0, bitorder="little")
+        masks = [int.from_bytes(column.tobytes(), "little") for column in packed.T]
+        self.masks[key] = first, masks
+        return first, masks
+
+    def clearing_mask(self, key, distance):
+        """Маска вариантов, проходящих объект на дистанции distance"""
+        first, masks = self.clearing(key)
+        if distance < first:
+            return 0
+        return masks[min(distance - first, len(masks) - 1)]
+
+    def shortest(self, mask):
+        """Вариант с самым коротким полетом из маски (None - маска пуста)"""
+        if not mask:
+            return None
+        return self.by_airtime[(mask & -mask).bit_length() - 1]
+
+    def clears(self, index, key, distance):
+        """Проходит ли вариант прыжка объект на заданной дистанции"""
+        for low, high in self.option_gaps(key)[index]:
+            if low <= distance <= high:
+                return True
+        return False
+
+# Общие таблицы прыжка по параметрам физики динозавра
+_jump_tables = {}
+
+def get_jump_table(physics, frame_ms=1000 / FPS):
+    """Таблица прыжков для физики physics: Dino, сам класс Dino или JumpBody"""
+    key = tuple(getattr(physics, name) for name in JUMP_PHYSICS) + (frame_ms,)
+    table = _jump_tables.get(key)
+    if table is None:
+        table = _jump_tables[key] = JumpTable(physics, frame_ms)
+    return table
+
+class Dino(GameObject, JumpBody):
+    def __init__(self, sound_enabled=True):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         image_path = os.path.join(current_dir, "images", "dino_walk_1.png")
-        super().__init__(10, SCREEN_HEIGHT - 43, 40, 43, image_path)  # Обновили позицию Y и высоту
+        GameObject.__init__(self, 10, SCREEN_HEIGHT - self.height, self.width, self.height, image_path)  # Обновили позицию Y и высоту
         
         self.walk_images = [
-            load_image(os.path.join(current_dir, "images", "dino_walk_1.png"), 40, 43),
-            load_image(os.path.join(current_dir, "images", "dino_walk_2.png"), 40, 43)
+            assets.get(os.path.join(current_dir, "images", "dino_walk_1.png"), 40, 43),
+            assets.get(os.path.join(current_dir, "images", "dino_walk_2.png"), 40, 43)
         ]
-        self.crash_image = load_image(os.path.join(current_dir, "images", "dino_crash.png"), 40, 43)
+        self.crash_image = assets.get(os.path.join(current_dir, "images", "dino_crash.png"), 40, 43)
         
-        self.gravity = 0.6
         self.velocity = 0
         self.is_jumping = False
         self.animation_count = 0
         self.is_crashed = False
-        self.min_jump_velocity = -6  # Уменьшили начальную скорость прыжка с -6 до -5
-        self.max_jump_velocity = -8  # Уменьшили максимальную скорость прыжка с -9 до -7
         self.jump_time = 0
-        self.max_jump_time = 150  # Уменьшили время удержания с 200 до 150
         self.is_jump_pressed = False
-        self.jump_sound = pygame.mixer.Sound(os.path.join(current_dir, "sounds", "jump.wav"))
+        self.jump_sound = sounds.get("jump", sound_enabled)
         self.auto_mode = False  # Добавляем флаг автоматического режима
         self.vision_distance = 250  # Увеличиваем дистанцию видимости
         self.next_obstacle = None  # Ближайшее препятствие
@@ -118,70 +757,73 @@ class Dino(GameObject):
             'medium': 120,  # Среднее расстояние
             'far': 180     # Дальнее расстояние
         }
+        self.jump_multipliers = dict(DEFAULT_JUMP_MULTIPLIERS)
+        self.autopilot = 'table'  # Стратегия автопилота (AUTOPILOT_STRATEGIES)
+
+    def configure_autopilot(self, params):
+        """Задает параметры автопилота из словаря
+
+        Поддерживаются ключи strategy, vision_distance, jump_adjustment,
+        jump_distances и любые ключи DEFAULT_JUMP_MULTIPLIERS (параметры
+        эвристики).
+        """
+        for key, value in params.items():
+            if key == 'strategy':
+                if value not in AUTOPILOT_STRATEGIES:
+                    raise ValueError(f"Неизвестная стратегия автопилота: {value}")
+                self.autopilot = value
+            elif key in ('vision_distance', 'jump_adjustment'):
+                setattr(self, key, value)
+            elif key == 'jump_distances':
+                self.jump_distances.update(value)
+            elif key in self.jump_multipliers:
+                self.jump_multipliers[key] = value
+            else:
+                raise KeyError(f"Неизвестный параметр автопилота: {key}")
 
     def start_jump(self):
         """Начало прыжка"""
-        if not self.is_jumping and self.rect.bottom >= SCREEN_HEIGHT:
+        # Используем рассчитанную силу прыжка в авто-режиме
+        if self.launch(self.auto_jump_power if self.auto_mode else self.min_jump_velocity):
             self.jump_sound.play()  # Воспроизводим звук прыжка
-            self.is_jumping = True
-            self.is_jump_pressed = True
-            self.jump_time = 0
-            self.velocity = self.auto_jump_power if self.auto_mode else self.min_jump_velocity  # Используем рассчитанную силу прыжка в авто-режиме
 
     def update(self, dt):
         if not self.is_crashed:
             # Обновление прыжка
-            if self.is_jumping and self.is_jump_pressed:
-                self.jump_time += dt * 1000  # Переводим в миллисекунды
-                if self.jump_time <= self.max_jump_time and self.velocity > self.max_jump_velocity:
-                    # Уменьшили коэффициент усиления с 3 до 2
-                    self.velocity = max(
-                        self.max_jump_velocity,
-                        self.min_jump_velocity - (self.jump_time / self.max_jump_time) * 2
-                    )
-
-            # Гравитация
-            self.velocity += self.gravity
-            self.rect.y += self.velocity
-            
-            # Ограничение по земле
-            if self.rect.bottom > SCREEN_HEIGHT:
-                self.rect.bottom = SCREEN_HEIGHT
-                self.velocity = 0
-                self.is_jumping = False
-                self.is_jump_pressed = False
-                self.jump_time = 0
-            
+            self.move(dt)
+
             # Анимация
             self.animation_count += 1
             if self.animation_count >= len(self.walk_images) * 10:
                 self.animation_count = 0
             self.image = self.walk_images[self.animation_count // 10]
 
-    def stop_jump(self):
-        """Окончание прыжка при отпускании кнопки"""
-        self.is_jump_pressed = False
-
     def crash(self):
         self.is_crashed = True
         self.image = self.crash_image
 
-    def should_jump(self, obstacles, pterodactyls):
-        """Определяет, нужно ли прыгать"""
+    def nearest_ahead(self, layer):
+        """Первый объект слоя впереди динозавра (слои отсортированы по x)"""
+        return layer.first_ahead(self.rect.right)
+
+    def should_jump(self, obstacles, pterodactyls, lookahead=None):
+        """Определяет, нужно ли прыгать
+
+        lookahead(тики) - события трассы на тики вперед (см. Game.upcoming_until),
+        по ним табличный автопилот видит объекты, которые появятся в полете.
+        """
+        if self.autopilot == 'table':
+            return self.plan_jump(obstacles, pterodactyls, lookahead)
         if not obstacles and not pterodactyls:
             return False
 
-        # Объединяем все препятствия
-        all_obstacles = []
-        all_obstacles.extend(obstacles)
-        all_obstacles.extend(pterodactyls)
-
-        # Ищем ближайшее препятствие впереди динозавра
+        # Ищем ближайшее препятствие впереди динозавра; при равенстве
+        # дистанций выигрывает кактус
         nearest = None
         min_distance = float('inf')
-        
-        for obstacle in all_obstacles:
-            if obstacle.rect.left > self.rect.right:  # Только препятствия впереди
+        for entities in (obstacles, pterodactyls):
+            obstacle = self.nearest_ahead(entities)
+            if obstacle is not None:
                 distance = obstacle.rect.left - self.rect.right
                 if distance < min_distance:
                     min_distance = distance
@@ -194,11 +836,11 @@ class Dino(GameObject):
             jump_distance = self.vision_distance * 0.4  # 40% от дистанции видимости
 
             # Корректируем расстояние в зависимости от типа и высоты препятствия
-            if isinstance(nearest, Pterodactyl):
+            if nearest.kind == Course.PTERODACTYL:
                 if nearest.rect.bottom < SCREEN_HEIGHT - 60:
-                    jump_distance *= 1.4  # Увеличиваем дистанцию для высоких птеродактилей
+                    jump_distance *= self.jump_multipliers['high_ptero_distance']  # Увеличиваем дистанцию для высоких птеродактилей
                 else:
-                    jump_distance *= 1.2  # Для низких птеродактилей
+                    jump_distance *= self.jump_multipliers['low_ptero_distance']  # Для низких птеродактилей
             else:
                 # Для кактусов учитываем их высоту
                 height_factor = nearest.rect.height / 40.0  # Нормализуем относительно стандартной высоты
@@ -214,6 +856,104 @@ class Dino(GameObject):
 
         return False
 
+    def plan_jump(self, obstacles, pterodactyls, lookahead=None):
+        """Выбор прыжка по таблицам траекторий (JumpTable)
+
+        Цель - ближайший кактус: птеродактили летят выше стоящего динозавра.
+        Если рядом нет других объектов, прыжок начинается на тике, после
+        которого оценка варианта для цели только ухудшится, а сила и
+        удержание берутся из таблицы. Если другие объекты могут встретиться
+        в полете, прыжок начинается на первом тике, когда есть вариант,
+        проходящий все объекты сразу. Кроме объектов на экране учитываются
+        объекты, которые трасса выставит за время полета (lookahead).
+        """
+        cactus = self.nearest_ahead(obstacles)
+        ptero = self.nearest_ahead(pterodactyls)
+        if obstacles or pterodactyls:
+            if ptero is not None and (cactus is None or ptero.rect.left < cactus.rect.left):
+                self.next_obstacle = ptero
+            else:
+                self.next_obstacle = cactus
+        if cactus is None or self.is_jumping or self.rect.bottom < SCREEN_HEIGHT:
+            return False
+
+        table = get_jump_table(self)
+        shift = scroll_shift(self.current_game_speed)
+        plan, closest = table.plan(table.key(cactus.rect, shift))
+        distance = cactus.rect.left - self.rect.right
+        if distance >= len(plan):
+            return False
+        entry = plan[distance]
+        if entry is None:
+            if distance > closest:
+                return False
+            # Ни один вариант уже не проходит: прыгаем как можно выше
+            self.auto_jump_power, self.auto_jump_duration = JumpTable.POWERS[-1], self.max_jump_time
+            return True
+
+        later = distance - shift
+        upcoming = lookahead(table.max_airtime) if lookahead is not None else ()
+        hazards = self.jump_hazards(table, cactus, shift, obstacles, pterodactyls, upcoming)
+        if hazards:
+            index = self.choose_jump(table, cactus, distance, shift, hazards)
+            if index is None:
+                if later >= closest:
+                    return False  # Ждем, пока мешающий объект пролетит
+                index = entry[1]
+        elif later >= 0 and plan[later] is not None and plan[later][0] > entry[0]:
+            return False  # Через тик прыгнуть будет лучше
+        else:
+            index = entry[1]
+        self.auto_jump_power, self.auto_jump_duration, _ = table.options[index]
+        return True
+
+    def jump_hazards(self, table, target, shift, obstacles, pterodactyls, upcoming=()):
+        """Ключи и дистанции объектов, кроме цели, которые можно встретить в полете
+
+        upcoming - пары (тиков до появления, событие трассы). Еще не
+        появившийся объект получает дистанцию, с которой он двигался бы с
+        текущего тика: кактус появляется у правого края после сдвига
+        кактусов, а птеродактиль в том же тике успевает сдвинуться.
+        """
+        hazards = []
+        ptero_shift = shift + Pterodactyl.speed
+        for entities, entity_shift in ((obstacles, shift), (pterodactyls, ptero_shift)):
+            reach = table.reach(entity_shift)
+            for entity in entities:
+                distance = entity.rect.left - self.rect.right
+                if distance > reach:
+                    break
+                if entity.id != target.id and entity.rect.right > self.rect.left:
+                    hazards.append((table.key(entity.rect, entity_shift), distance))
+        edge = SCREEN_WIDTH - self.rect.right
+        for ticks, event in upcoming:
+            if event.kind == Course.CACTUS:
+                entity_shift, distance = shift, edge + (ticks + 1) * shift
+            elif event.kind == Course.PTERODACTYL:
+                entity_shift, distance = ptero_shift, edge + ticks * ptero_shift
+            else:
+                continue
+            if distance <= table.reach(entity_shift):
+                key = (entity_shift, event.y, event.y + event.height, event.width)
+                hazards.append((key, distance))
+        return hazards
+
+    def choose_jump(self, table, target, distance, shift, hazards):
+        """Самый короткий вариант, проходящий цель и все мешающие объекты (None - такого нет)"""
+        mask = table.clearing_mask(table.key(target.rect, shift), distance)
+        for key, d in hazards:
+            mask &= table.clearing_mask(key, d)
+        return table.shortest(mask)
+
+    def jump_reach(self, game_speed):
+        """Наибольшая дистанция, на которой should_jump реагирует на препятствие"""
+        if self.autopilot == 'table':
+            return get_jump_table(self).reach(scroll_shift(game_speed))
+        factor = max(self.jump_multipliers['high_ptero_distance'],
+                     self.jump_multipliers['low_ptero_distance'],
+                     1 + 1.0 * 0.2)  # Кактус стандартной высоты
+        return self.vision_distance * 0.4 * factor * (game_speed / 4.0)
+
     def calculate_jump_power(self, obstacle):
         """Рассчитывает необходимую силу прыжка для преодоления препятствия"""
         if not obstacle:
@@ -224,7 +964,7 @@ class Dino(GameObject):
         
         # Базовая сила прыжка зависит от расстояния до препятствия
         if distance < self.jump_distances['near']:
-            base_power = self.max_jump_velocity * 1.2  # Сильный прыжок для близких препятствий
+            base_power = self.max_jump_velocity * self.jump_multipliers['near_power']  # Сильный прыжок для близких препятствий
             duration = self.max_jump_time * 0.9
         elif distance < self.jump_distances['medium']:
             base_power = self.max_jump_velocity * 1.1
@@ -234,9 +974,9 @@ class Dino(GameObject):
             duration = self.max_jump_time * 0.7
 
         # Дополнительная корректировка для птеродактилей
-        if isinstance(obstacle, Pterodactyl):
+        if obstacle.kind == Course.PTERODACTYL:
             if obstacle.rect.bottom < SCREEN_HEIGHT - 60:
-                base_power *= 1.2  # Усиливаем прыжок для высоко летящих птеродактилей
+                base_power *= self.jump_multipliers['high_ptero_power']  # Усиливаем прыжок для высоко летящих птеродактилей
                 duration *= 0.9
             else:
                 base_power *= 0.9  # Ослабляем для низко летящих
@@ -244,7 +984,7 @@ class Dino(GameObject):
         else:
             # Корректировка для кактусов разной высоты
             if height_diff > 35:
-                base_power *= 1.15
+                base_power *= self.jump_multipliers['tall_cactus_power']
                 duration *= 0.95
             elif height_diff > 25:
                 base_power *= 1.1
@@ -262,95 +1002,812 @@ class Dino(GameObject):
         
         return power, duration
 
-class Cloud(GameObject):
-    def __init__(self, x, y):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Используем оригинальные размеры из main.js
-        width = random.randint(60, 65)   # Оригинальная ширина
-        height = random.randint(20, 25)   # Оригинальная высота
-        super().__init__(x, y, width, height, os.path.join(current_dir, "images", "cloud.png"))
-        self.speed = 2  # Облака двигаются медленнее чем препятствия
+class Cloud:
+    """Вид объекта - облако; сами облака хранятся в EntityLayer"""
+    image_path = os.path.join(BASE_DIR, "images", "cloud.png")
+    speed = 2  # Облака двигаются медленнее чем препятствия
+
+class Pterodactyl:
+    """Вид объекта - птеродактиль; сами птеродактили хранятся в EntityLayer"""
+    speed = 4  # Уменьшаем скорость с 6 до 4
+    fly_image_paths = [
+        os.path.join(BASE_DIR, "images", "ptero_fly1.png"),
+        os.path.join(BASE_DIR, "images", "ptero_fly2.png"),
+    ]
+    heights = [SCREEN_HEIGHT - 40 - 40, SCREEN_HEIGHT - 80 - 40]  # Две возможные высоты полета
+    frame_ticks = 10  # Тиков на кадр взмаха крыльев
+
+class Entity:
+    """Снимок объекта слоя на текущем тике: номер, вид, прямоугольник и кадр
+
+    Для кода, которому удобнее отдельные объекты (автопилот, debug).
+    Прямоугольник - копия: слой при этом не меняется, а снимок не
+    следует за объектом на следующих тиках. id объекта постоянен.
+    """
+    __slots__ = ("layer", "id", "rect", "frame")
+
+    def __init__(self, layer, entity_id, rect, frame):
+        self.layer = layer
+        self.id = entity_id
+        self.rect = rect
+        self.frame = frame
+
+    @property
+    def kind(self):
+        return self.layer.kind
+
+    @property
+    def image(self):
+        return self.layer.sprite(self.rect.width, self.rect.height, self.frame)
+
+class EntityLayer:
+    """Объекты одного вида в плотных массивах NumPy (struct-of-arrays).
+
+    Вместо GameObject с собственным Rect на каждый объект координаты,
+    размеры и кадры анимации лежат в массивах int32. Объекты появляются у
+    правого края и уходят за левый в порядке появления, поэтому живые
+    объекты - непрерывный диапазон [head, tail), отсортированный по x:
+    удаление ушедших - сдвиг head, прокрутка и анимация - одна операция над
+    срезом, сколько бы объектов ни было. Номер объекта (id) не меняется,
+    когда массивы уплотняются или растут.
+
+    Кадр анимации не хранится: слой ведет общий счетчик phase, а у объекта
+    запоминается значение счетчика при появлении (start). Кадр - их
+    разность по модулю period, так что анимация всего слоя - сложение.
+    """
+    def __init__(self, kind, sprite_paths, frame_ticks=1, capacity=16):
+        self.kind = kind
+        self.sprite_paths = sprite_paths
+        self.frame_ticks = frame_ticks
+        self.period = len(sprite_paths) * frame_ticks
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.width = np.zeros(capacity, dtype=np.int32)
+        self.height = np.zeros(capacity, dtype=np.int32)
+        self.start = np.zeros(capacity, dtype=np.int32)
+        self.phase = 0
+        self.head = 0
+        self.tail = 0
+        self.base = 0  # id объекта в ячейке 0
+        self.spawned = 0
+        self.grown = 0  # Сколько раз массивы выделялись заново (удвоение)
+        self.sprites = {}
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def __iter__(self):
+        """Снимки живых объектов слева направо"""
+        for entity_id, x, y, width, height, frame in self.rows():
+            yield Entity(self, entity_id, pygame.Rect(x, y, width, height), frame)
+
+    def clear(self):
+        self.base += self.tail
+        self.head = self.tail = 0
+
+    def spawn(self, x, y, width, height):
+        """Добавляет объект справа, возвращает его id"""
+        if self.tail == len(self.x):
+            self.make_room()
+        slot = self.tail
+        self.x[slot] = x
+        self.y[slot] = y
+        self.width[slot] = width
+        self.height[slot] = height
+        self.start[slot] = self.phase
+        self.tail += 1
+        self.spawned += 1
+        return self.base + slot
+
+    def make_room(self):
+        """Сдвигает живые объекты в начало массивов, при нехватке места удваивает их"""
+        live = self.tail - self.head
+        capacity = len(self.x)
+        if live * 2 > capacity:
+            capacity *= 2
+            self.grown += 1
+        for name in ("x", "y", "width", "height", "start"):
+            array = getattr(self, name)
+            if capacity != len(array):
+                moved = np.zeros(capacity, dtype=array.dtype)
+                moved[:live] = array[self.head:self.tail]
+                setattr(self, name, moved)
+            else:
+                array[:live] = array[self.head:self.tail]
+        self.base += self.head
+        self.head = 0
+        self.tail = live
 
-class Land(GameObject):
-    def __init__(self, x, is_bump=False):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.is_bump = is_bump
+    def slot(self, entity_id):
+        return entity_id - self.base
+
+    def scroll(self, speed):
+        """Сдвиг влево, как у rect.x -= speed для каждого объекта"""
+        if self.head == self.tail:
+            return
+        xs = self.x[self.head:self.tail]
+        shift = scroll_shift(speed)
+        if is_half_shift(speed):
+            # x - speed с дробью 0.5 левее нуля pygame.Rect округляет от нуля
+            behind = xs < speed
+            xs -= shift
+            xs[behind] -= 1
+        else:
+            xs -= shift
+
+    def shift(self, pixels):
+        """Сдвиг всех объектов влево на целое число пикселей"""
+        if self.head != self.tail:
+            self.x[self.head:self.tail] -= pixels
+
+    def cull(self):
+        """Удаляет объекты, полностью ушедшие за левый край"""
+        x, width, head, tail = self.x, self.width, self.head, self.tail
+        while head < tail and x[head] + width[head] < 0:
+            head += 1
+        self.head = head
+
+    def animate(self, ticks=1):
+        """Продвигает анимацию всех объектов на ticks тиков"""
+        self.phase = (self.phase + ticks) % self.period
+
+    def set_frame(self, entity_id, frame):
+        """Ставит объекту кадр анимации frame (в тиках)"""
+        self.start[self.slot(entity_id)] = (self.phase - frame) % self.period
+
+    def frames(self, head, tail):
+        """Кадры анимации объектов в ячейках [head, tail)"""
+        if self.period == 1:
+            return [0] * (tail - head)
+        return ((self.phase - self.start[head:tail]) % self.period).tolist()
+
+    def sprite(self, width, height, frame=0):
+        """Поверхность объекта такого размера на кадре анимации frame"""
+        key = (width, height, frame // self.frame_ticks)
+        surface = self.sprites.get(key)
+        if surface is None:
+            surface = assets.get(self.sprite_paths[key[2]], int(width), int(height))
+            self.sprites[key] = surface
+        return surface
+
+    def rows(self):
+        """(id, x, y, ширина, высота, кадр) живых объектов слева направо"""
+        head, tail = self.head, self.tail
+        return zip(range(self.base + head, self.base + tail),
+                   self.x[head:tail].tolist(), self.y[head:tail].tolist(),
+                   self.width[head:tail].tolist(), self.height[head:tail].tolist(),
+                   self.frames(head, tail))
+
+    def rects(self):
+        return [pygame.Rect(x, y, width, height) for _, x, y, width, height, _ in self.rows()]
+
+    def first_ahead(self, left):
+        """Снимок первого объекта с x больше left или None"""
+        xs = self.x[self.head:self.tail].tolist()
+        index = bisect.bisect_right(xs, left)
+        if index == len(xs):
+            return None
+        slot = self.head + index
+        return Entity(self, self.base + slot,
+                      pygame.Rect(xs[index], int(self.y[slot]),
+                                  int(self.width[slot]), int(self.height[slot])),
+                      self.frames(slot, slot + 1)[0])
+
+    def stats(self):
+        return {"live": len(self), "capacity": len(self.x), "spawned": self.spawned,
+                "grown": self.grown}
+
+class TextCache:
+    """LRU-кэш отрисованного текста по ключу (шрифт, строка, цвет)"""
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        """Статистика попаданий в кэш текста"""
+        return {"entries": len(self.surfaces), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+class GlyphAtlas:
+    """Атлас цифр: число собирается из заранее отрисованных глифов.
+
+    Счет меняется каждый кадр, поэтому целиком строку кэшировать
+    бесполезно. Неизменная подпись берется из TextCache, а цифры
+    ставятся по их ширине (advance) из метрик шрифта одним вызовом blits.
+    """
+    DIGITS = "0123456789"
+
+    def __init__(self, text_cache):
+        self.text_cache = text_cache
+        self.glyphs = {}   # (шрифт, цвет) -> [(surface, advance)] по цифрам
+        self.advances = {}  # (шрифт, строка) -> ширина
+
+    def advance(self, font, text):
+        """Ширина строки как сумма advance ее символов"""
+        key = (font, text)
+        width = self.advances.get(key)
+        if width is None:
+            width = 0
+            for metrics in font.metrics(text):
+                width += metrics[4] if metrics is not None else 0
+            self.advances[key] = width
+        return width
+
+    def digits(self, font, color):
+        key = (font, color)
+        glyphs = self.glyphs.get(key)
+        if glyphs is None:
+            glyphs = [
+                (self.text_cache.render(font, digit, color), self.advance(font, digit))
+                for digit in self.DIGITS
+            ]
+            self.glyphs[key] = glyphs
+        return glyphs
+
+    def warm(self, font, color):
+        """Заранее рендерит цифры для шрифта и цвета"""
+        self.digits(font, color)
+
+    def draw(self, screen, font, prefix, value, color, pos):
+        """Рисует подпись и число, возвращает занятый прямоугольник"""
+        x, y = pos
+        area = screen.blit(self.text_cache.render(font, prefix, color), pos)
+        x += self.advance(font, prefix)
+        glyphs = self.digits(font, color)
+        sequence = []
+        for char in str(value):
+            surface, advance = glyphs[ord(char) - 48]
+            sequence.append((surface, (x, y)))
+            x += advance
+        return area.unionall(screen.blits(sequence))
+
+def scroll_shift(speed):
+    """На сколько целых пикселей сдвигается объект с rect.x -= speed (округление pygame.Rect)"""
+    return SCREEN_WIDTH - int(SCREEN_WIDTH - speed + 0.5)
+
+def is_half_shift(speed):
+    """Сдвиг с дробной частью ровно 0.5: слева от нуля pygame.Rect округляет его иначе"""
+    return speed % 1 == 0.5
+
+def swept_aabb(rect, dx, dy, target):
+    """Непрерывная проверка столкновения прямоугольников (swept AABB).
+
+    rect сдвигается на (dx, dy) за шаг, target неподвижен. Возвращает долю
+    шага 0..1, на которой прямоугольники впервые пересекаются (в смысле
+    Rect.colliderect), или None, если за шаг они не пересекаются.
+    """
+    enter, leave = 0.0, 1.0
+    for start, size, delta, target_start, target_size in (
+        (rect.x, rect.width, dx, target.x, target.width),
+        (rect.y, rect.height, dy, target.y, target.height),
+    ):
+        # Интервал по оси, на котором start < target_end и target_start < start + size
+        low = target_start - size
+        high = target_start + target_size
+        if delta == 0:
+            if not low < start < high:
+                return None
+            continue
+        t_low = (low - start) / delta
+        t_high = (high - start) / delta
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        enter = max(enter, t_low)
+        leave = min(leave, t_high)
+        if enter >= leave:
+            return None
+    return enter
+
+class GroundStrip:
+    """Предрисованная прокручиваемая полоса земли.
+
+    Сегменты земли (обычные и бугорки) генерируются в том же порядке и с
+    теми же случайными числами, что и раньше, но рисуются один раз в
+    широкие чанки. Кадр рисует видимые чанки со смещением - одна-две
+    операции blit. Ушедшие за экран чанки удаляются.
+    """
+    bump_image_path = os.path.join(BASE_DIR, "images", "land_bump.png")
+    normal_image_path = os.path.join(BASE_DIR, "images", "land_normal.png")
+    CHUNK_WIDTH = 1024
+    TOP = SCREEN_HEIGHT - 15  # Верх бугорка
+    HEIGHT = 12               # Бугорок - самый высокий сегмент
+
+    def __init__(self, rng, cull_margin=20):
+        self.rng = rng
+        self.cull_margin = cull_margin
+        self.on_chunk_changed = None  # Вызывается при дорисовке видимого чанка
+        self.bump_image = assets.get(self.bump_image_path, 60, 12)
+        self.normal_image = assets.get(self.normal_image_path, 100, 5)
+        self.chunks = {}
+        self.free_chunks = []  # Поверхности ушедших чанков для повторного использования
+        self.offset = 0  # Мировая координата левого края экрана
+        self.right = 0   # Мировая координата конца последнего сегмента
+        self.segments = 0
+
+    def reset(self):
+        """Создаем начальную землю (как initialize_land)"""
+        for index in list(self.chunks):
+            self.release_chunk(index)
+        self.offset = 0
+        self.right = 0
+        self.segments = 0
+        self.fill()
+
+    def fill(self):
+        """Добавляем сегменты, пока справа не будет запаса (как spawn_land)"""
+        while self.right - self.offset < SCREEN_WIDTH + 200:
+            is_bump = self.rng.random() < 0.1  # 10% шанс появления бугорка
+            self.add_segment(is_bump)
+
+    def add_segment(self, is_bump):
+        # Используем оригинальные размеры из main.js
         if is_bump:
-            # Используем оригинальные размеры из main.js
-            super().__init__(x, SCREEN_HEIGHT - 15, 60, 12, 
-                           os.path.join(current_dir, "images", "land_bump.png"))
+            image, y = self.bump_image, 0
         else:
-            # Используем оригинальные размеры из main.js
-            super().__init__(x, SCREEN_HEIGHT - 10, 100, 5, 
-                           os.path.join(current_dir, "images", "land_normal.png"))
+            image, y = self.normal_image, 5
+        width = image.get_width()
+        x = self.right
+        for index in range(x // self.CHUNK_WIDTH, (x + width - 1) // self.CHUNK_WIDTH + 1):
+            chunk = self.chunks.get(index)
+            if chunk is None:
+                chunk = self.chunks[index] = self.new_chunk()
+            # Сегменты не пересекаются, MAX копирует пиксели вместе с альфой
+            chunk.blit(image, (x - index * self.CHUNK_WIDTH, y), special_flags=pygame.BLEND_RGBA_MAX)
+            if self.on_chunk_changed is not None:
+                self.on_chunk_changed(chunk)
+        self.right += width
+        self.segments += 1
+
+    def scroll(self, speed):
+        self.offset += scroll_shift(speed)
+        # Удаляем чанки, полностью ушедшие за экран
+        first_visible = (self.offset - self.cull_margin) // self.CHUNK_WIDTH
+        for index in [i for i in self.chunks if i < first_visible]:
+            self.release_chunk(index)
+
+    def new_chunk(self):
+        if self.free_chunks:
+            chunk = self.free_chunks.pop()
+            chunk.fill((0, 0, 0, 0))
+            return chunk
+        return pygame.Surface((self.CHUNK_WIDTH, self.HEIGHT), pygame.SRCALPHA)
+
+    def release_chunk(self, index):
+        chunk = self.chunks.pop(index)
+        if len(self.free_chunks) < 4:
+            self.free_chunks.append(chunk)
+
+    def visible_chunks(self):
+        """Пары (чанк, x на экране) для видимой части полосы"""
+        first = self.offset // self.CHUNK_WIDTH
+        last = (self.offset + SCREEN_WIDTH - 1) // self.CHUNK_WIDTH
+        for index in range(first, last + 1):
+            chunk = self.chunks.get(index)
+            if chunk is not None:
+                yield chunk, index * self.CHUNK_WIDTH - self.offset
+
+    def draw(self, screen, tint=None, dx=0):
+        for chunk, x in self.visible_chunks():
+            screen.blit(tint(chunk) if tint else chunk, (x + dx, self.TOP))
+
+# Секции замера времени кадра (в порядке колонок CSV)
+PROFILE_SECTIONS = [
+    "events",
+    "update", "update.dino", "update.clouds", "update.land", "update.obstacles",
+    "update.collisions", "update.spawn", "update.pterodactyls", "update.autopilot",
+    "draw", "draw.background", "draw.clouds", "draw.land", "draw.dino",
+    "draw.obstacles", "draw.pterodactyls", "draw.score", "draw.debug",
+    "draw.night_effect", "draw.flip",
+]
+
+class _ProfileSection:
+    """Контекстный менеджер одной секции (переиспользуется между кадрами)"""
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.started)
+        return False
 
-class Pterodactyl(GameObject):
-    def __init__(self):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        super().__init__(SCREEN_WIDTH, 0, 40, 35,  # Обновленные размеры
-                        os.path.join(current_dir, "images", "ptero_fly1.png"))
-        
-        # Загружаем кадры анимации с новыми размерами
-        self.fly_images = [
-            load_image(os.path.join(current_dir, "images", "ptero_fly1.png"), 40, 35),
-            load_image(os.path.join(current_dir, "images", "ptero_fly2.png"), 40, 35)
-        ]
-        
-        # Устанавливаем случайную высоту полета
-        self.heights = [SCREEN_HEIGHT - 40 - 40, SCREEN_HEIGHT - 80 - 40]  # Две возможные высоты
-        self.rect.y = random.choice(self.heights)
-        
-        self.animation_count = 0
-        self.speed = 4  # Уменьшаем скорость с 6 до 4
+class _NullSection:
+    __slots__ = ()
 
-    def update(self, game_speed):
-        # Движение влево
-        self.rect.x -= game_speed + self.speed
-        
-        # Анимация
-        self.animation_count += 1
-        if self.animation_count >= len(self.fly_images) * 10:
-            self.animation_count = 0
-        self.image = self.fly_images[self.animation_count // 10]
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SECTION = _NullSection()
+
+class FrameProfiler:
+    """Замеры времени по фазам кадра.
+
+    Время секций суммируется за кадр (секция может вызываться много раз,
+    например night_effect), а в конце кадра попадает в скользящее окно,
+    по которому считаются p50/p95/p99. Кадры можно писать в CSV или JSONL.
+    """
+    def __init__(self, enabled=True, window=600, refresh_interval=30):
+        self.enabled = enabled
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self.sections = {}
+        self.current = {}
+        self.history = {}
+        self.frame_started = None
+        self.frame_count = 0
+        self.cached_stats = {}
+        self.output = None
+        self.writer = None
+        self.output_format = None
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL_SECTION
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = _ProfileSection(self, name)
+        return section
+
+    def add(self, name, seconds):
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_started = time.perf_counter()
+
+    def end_frame(self):
+        """Закрывает кадр: переносит суммы секций в историю и в файл"""
+        if not self.enabled or self.frame_started is None:
+            return
+        self.current["frame"] = time.perf_counter() - self.frame_started
+        for name, seconds in self.current.items():
+            samples = self.history.get(name)
+            if samples is None:
+                samples = self.history[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+        if self.output is not None:
+            self.write_frame(self.current)
+
+        self.frame_count += 1
+        if self.frame_count % self.refresh_interval == 0:
+            self.cached_stats = self.compute_stats()
+        self.current = {}
+        self.frame_started = None
+
+    @staticmethod
+    def percentile(sorted_samples, fraction):
+        index = min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))
+        return sorted_samples[index]
+
+    def compute_stats(self):
+        """p50/p95/p99 в миллисекундах для каждой секции"""
+        stats = {}
+        for name, samples in self.history.items():
+            ordered = sorted(samples)
+            stats[name] = tuple(
+                self.percentile(ordered, fraction) * 1000 for fraction in (0.5, 0.95, 0.99)
+            )
+        return stats
+
+    def stats(self):
+        """Последняя рассчитанная статистика (обновляется раз в refresh_interval кадров)"""
+        return self.cached_stats
+
+    def open_output(self, path):
+        """Начинает запись кадров в CSV или JSONL (по расширению файла)"""
+        self.output = open(path, "w", newline="", encoding="utf-8")
+        if path.endswith(".jsonl"):
+            self.output_format = "jsonl"
+        else:
+            self.output_format = "csv"
+            self.writer = csv.writer(self.output)
+            self.writer.writerow(["frame", "frame_ms"] + [f"{name}_ms" for name in PROFILE_SECTIONS])
+
+    def write_frame(self, timings):
+        if self.output_format == "jsonl":
+            record = {"frame": self.frame_count, "frame_ms": round(timings["frame"] * 1000, 4)}
+            record.update({
+                f"{name}_ms": round(seconds * 1000, 4)
+                for name, seconds in timings.items() if name != "frame"
+            })
+            self.output.write(json.dumps(record) + "\n")
+        else:
+            self.writer.writerow(
+                [self.frame_count, round(timings["frame"] * 1000, 4)] +
+                [round(timings.get(name, 0.0) * 1000, 4) for name in PROFILE_SECTIONS]
+            )
+
+    def close(self):
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+            self.writer = None
+
+# Действия игрока, которые влияют на симуляцию (пишутся в запись игры)
+ACTION_JUMP_PRESS = 1
+ACTION_JUMP_RELEASE = 2
+ACTION_TOGGLE_NIGHT = 3
+ACTION_TOGGLE_AUTO = 4
+ACTION_RESTART = 5
+
+def _write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def _read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+# Появление объекта у правого края: tick - значение счета в update, где
+# объект появляется, distance - путь земли к этому тику
+SpawnEvent = namedtuple("SpawnEvent", "tick kind distance y width height")
+
+class Course:
+    """Ленивая трасса: поток событий появления объектов из одного зерна
+
+    Генератор идет по тикам с той же кривой скорости и теми же целыми
+    сдвигами, что и Game.update, и отслеживает правые края последних
+    объектов, поэтому события наступают ровно тогда, когда раньше
+    срабатывали проверки хвостов списков. Случайные размеры и высоты и
+    бросок 1% для птеродактилей берутся из своего генератора чисел, так
+    что заглядывание вперед (peek) не меняет игру.
+    """
+    CACTUS = "cactus"
+    CLOUD = "cloud"
+    PTERODACTYL = "pterodactyl"
+
+    def __init__(self, seed, initial_speed, speed_increment, max_speed):
+        self.rng = random.Random(seed)
+        self.initial_speed = initial_speed
+        self.speed_increment = speed_increment
+        self.max_speed = max_speed
+        self.events = self.generate()
+        self.pending = deque()
+
+    def generate(self):
+        rng = self.rng
+        initial, increment, top = self.initial_speed, self.speed_increment, self.max_speed
+        # Генератор идет по каждому тику, поэтому scroll_shift и speed
+        # развернуты здесь вручную
+        width = SCREEN_WIDTH
+        cactus_gap = width - 300
+        ptero_gap = width - 400
+        tick = 0
+        distance = 0
+        speed = initial
+        cactus_tail = cloud_tail = ptero_tail = None
+        while True:
+            shift = width - int(width - speed + 0.5)
+            distance += shift
+            # Сдвиги до проверок появления, в том же порядке, что и в update
+            if cloud_tail is not None:
+                cloud_tail -= 2
+            if cactus_tail is not None:
+                cactus_tail -= shift
+            if cactus_tail is None or cactus_tail < cactus_gap:
+                yield SpawnEvent(tick, self.CACTUS, distance, SCREEN_HEIGHT - 40, 20, 40)
+                cactus_tail = width + 20
+            if cloud_tail is None or cloud_tail < cactus_gap:
+                y = rng.randint(20, 80)
+                cloud_width = rng.randint(60, 65)
+                cloud_height = rng.randint(20, 25)
+                yield SpawnEvent(tick, self.CLOUD, distance, y, cloud_width, cloud_height)
+                cloud_tail = width + cloud_width
+            # Птеродактили только после 500 очков и с вероятностью 1% за тик
+            if (tick > 500 and
+                    (ptero_tail is None or ptero_tail < ptero_gap) and
+                    rng.random() < 0.01):
+                yield SpawnEvent(tick, self.PTERODACTYL, distance,
+                                 rng.choice(Pterodactyl.heights), 40, 35)
+                ptero_tail = width + 40
+            tick += 1
+            if speed < top:
+                speed = min(top, initial + tick * increment)
+            # Птеродактили двигаются уже с новой скоростью
+            if ptero_tail is not None:
+                ptero_tail -= width - int(width - speed - Pterodactyl.speed + 0.5)
+
+    def peek(self, count=1, kinds=None):
+        """Следующие count событий (только видов kinds, если заданы), не продвигая курсор"""
+        if kinds is None:
+            while len(self.pending) < count:
+                self.pending.append(next(self.events))
+            return list(self.pending)[:count]
+        found = [event for event in self.pending if event.kind in kinds]
+        while len(found) < count:
+            event = next(self.events)
+            self.pending.append(event)
+            if event.kind in kinds:
+                found.append(event)
+        return found[:count]
+
+    def peek_until(self, tick):
+        """События, наступающие раньше тика tick"""
+        while not self.pending or self.pending[-1].tick < tick:
+            self.pending.append(next(self.events))
+        return [event for event in self.pending if event.tick < tick]
+
+    def next_tick(self):
+        if not self.pending:
+            self.pending.append(next(self.events))
+        return self.pending[0].tick
+
+    def pop(self):
+        if not self.pending:
+            self.pending.append(next(self.events))
+        return self.pending.popleft()
+
+class InputRecording:
+    """Компактная запись ввода игрока для воспроизведения.
+
+    Формат файла: заголовок (сигнатура, версия, зерно, длительность кадра,
+    число кадров, итоговый счет, число событий), затем события в виде
+    varint-разницы номера кадра и одного байта действия.
+    """
+    MAGIC = b"DREC"
+    VERSION = 3  # 2: объекты появляются по трассе Course; 3: точная длина шага в прыжке
+    HEADER = struct.Struct("<4sBqdIII")
+
+    def __init__(self, seed, frame_ms=1000 / FPS):
+        self.seed = seed
+        self.frame_ms = frame_ms
+        self.events = []  # (кадр, действие)
+        self.frames = 0
+        self.final_score = 0
+
+    def record(self, frame, action):
+        self.events.append((frame, action))
+
+    def finish(self, frames, score):
+        """Запоминает итог записи для проверки при воспроизведении"""
+        self.frames = frames
+        self.final_score = score
+
+    def to_bytes(self):
+        data = bytearray(self.HEADER.pack(
+            self.MAGIC, self.VERSION, self.seed, self.frame_ms,
+            self.frames, self.final_score, len(self.events)
+        ))
+        last_frame = 0
+        for frame, action in self.events:
+            _write_varint(data, frame - last_frame)
+            data.append(action)
+            last_frame = frame
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, frame_ms, frames, score, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Неизвестный формат записи игры")
+        recording = cls(seed, frame_ms)
+        recording.finish(frames, score)
+        pos = cls.HEADER.size
+        frame = 0
+        for _ in range(count):
+            delta, pos = _read_varint(data, pos)
+            frame += delta
+            recording.events.append((frame, data[pos]))
+            pos += 1
+        return recording
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Chrome Dino Game")
+    cactus_image_path = os.path.join(BASE_DIR, "images", "obstical_cactus.png")
+
+    def __init__(self, headless=False, seed=None, fixed_step=False, recording=None,
+                 dirty_rects=False, audio=True, render_fps=FPS):
+        # В headless режиме нет окна, звука и ограничения кадров.
+        # Время всегда идет по симулированным часам тиками по TICK_MS
+        self.headless = headless
+        self.audio = audio and not headless
+        self.sim_ticks = 0
+        # fixed_step: ровно один тик на отрисованный кадр, как в headless.
+        # Иначе окно рисует с частотой render_fps, а тики набираются по
+        # реальному времени, и draw интерполирует между двумя последними
+        self.fixed_step = fixed_step or headless
+        self.render_fps = render_fps
+        # Смещения последнего тика для интерполяции: (скорость, прошлый y
+        # динозавра) или None, если с прошлого тика ничего не двигалось
+        self.motion = None
+        self.frame = 0  # Номер кадра симуляции
+        # Свой генератор случайных чисел, чтобы игры можно было повторить
+        self.rng = random.Random(seed)
+        self.recording = recording
+        # Режим грязных прямоугольников: обновляются только изменившиеся области
+        self.dirty_rects = dirty_rects
+        self.previous_dirty = None
+        self.dirty_fraction = 1.0
+        self.text_rects = []
+        # Замеры времени фаз кадра (в headless режиме не нужны)
+        self.profiler = FrameProfiler(enabled=not headless)
+        # Объекты, которые постоянно появляются и уходят за экран, хранятся
+        # слоями массивов: прокрутка и удаление не перебирают их по одному
+        self.obstacles = EntityLayer(Course.CACTUS, [self.cactus_image_path])
+        self.clouds = EntityLayer(Course.CLOUD, [Cloud.image_path])
+        self.pterodactyls = EntityLayer(Course.PTERODACTYL, Pterodactyl.fly_image_paths,
+                                        Pterodactyl.frame_ticks)
+
+        if headless:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.audio = init_window(self.audio)
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Chrome Dino Game")
         
         # Устанавливаем иконку игры
         current_dir = os.path.dirname(os.path.abspath(__file__))
         icon_path = os.path.join(current_dir, "images", "game-icon.png")
-        if os.path.exists(icon_path):
+        if not headless and os.path.exists(icon_path):
             icon = pygame.image.load(icon_path)
             pygame.display.set_icon(icon)
         
         self.clock = pygame.time.Clock()
         
+        # Кэш отрисованного текста и атлас цифр для счета
+        self.text_cache = TextCache()
+        self.glyphs = GlyphAtlas(self.text_cache)
+
         # Загружаем пользовательский шрифт
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        font_path = os.path.join(current_dir, "fonts", "arcade_font.TTF")
-        if os.path.exists(font_path):
-            self.font = pygame.font.Font(font_path, 8)  # для счета
-            self.debug_font = pygame.font.Font(font_path, 8)  # для debug информации
-        else:
-            print("Шрифт не найден, использую стандартный")
-            self.font = pygame.font.Font(None, 36)
-            self.debug_font = pygame.font.Font(None, 36)
+        self.font, self.debug_font = load_fonts()
         
-        self.dino = Dino()
-        self.obstacles = []
-        self.clouds = []
-        self.lands = []
-        self.pterodactyls = []  # Добавляем список для птеродактилей
+        self.dino = Dino(sound_enabled=self.audio)
         self.score = 0
         self.running = True
         self.initial_game_speed = 4  # Начальная скорость
         self.game_speed = self.initial_game_speed
         self.speed_increment = 0.001  # Увеличение скорости за каждое очко
         self.max_game_speed = 8  # Максимальная скорость
-        self.last_time = pygame.time.get_ticks()
+        self.last_time = self.get_ticks()
         self.land_width = 20  # Фиксированная ширина для всех элементов земли
+        # Земля - одна предрисованная полоса вместо множества отдельных сегментов
+        self.ground = GroundStrip(self.rng, self.land_width)
         self.initialize_land()
         
         # Добавляем параметры дня и ночи
@@ -363,18 +1820,22 @@ class Game:
         self.night_color = (32, 33, 36)   # #202124 для ночи
         self.sprite_day_color = (0, 0, 0)      # Черный для спрайтов днем
         self.sprite_night_color = (255, 255, 255)  # Белый для спрайтов ночью
+        # Цифры счета в обоих цветах отрисовываются один раз
+        for color in (self.sprite_day_color, self.sprite_night_color):
+            self.glyphs.warm(self.font, color)
+        self.night_cache = NightTintCache()  # Кэш ночных версий спрайтов
+        # Дорисованный чанк земли нужно заново перевести в ночной вид
+        self.ground.on_chunk_changed = self.night_cache.invalidate
 
         # Добавляем спрайты для Game Over экрана с поддержкой прозрачности
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.game_over_sprite = pygame.image.load(
-            os.path.join(current_dir, "images", "game_over.png")
-        ).convert_alpha()
-        self.game_over_sprite = pygame.transform.scale(self.game_over_sprite, (250, 15))  # Исправленные размеры
+        self.game_over_sprite = assets.get(
+            os.path.join(current_dir, "images", "game_over.png"), 250, 15  # Исправленные размеры
+        )
         
-        self.reset_button = pygame.image.load(
-            os.path.join(current_dir, "images", "replay_button.png")  # Изменен путь к файлу
-        ).convert_alpha()
-        self.reset_button = pygame.transform.scale(self.reset_button, (34, 30))  # Новые размеры 34x30
+        self.reset_button = assets.get(
+            os.path.join(current_dir, "images", "replay_button.png"), 34, 30  # Новые размеры 34x30
+        )
         
         # Создаем прямоугольники для позиционирования
         self.game_over_rect = self.game_over_sprite.get_rect()
@@ -385,10 +1846,9 @@ class Game:
         self.show_advanced_debug = False  # Расширенный debug (M)
         self.show_vision = False  # Флаг для отображения линии зрения
 
-        # Загружаем звуки
-        self.jump_sound = pygame.mixer.Sound(os.path.join(current_dir, "sounds", "jump.wav"))
-        self.point_sound = pygame.mixer.Sound(os.path.join(current_dir, "sounds", "point.wav"))
-        self.die_sound = pygame.mixer.Sound(os.path.join(current_dir, "sounds", "die.wav"))
+        # Звуки берутся из общего банка (декодируются один раз)
+        self.point_sound = sounds.get("point", self.audio)
+        self.die_sound = sounds.get("die", self.audio)
         
         # Добавляем переменную для отслеживания последней тысячи очков
         self.last_point_score = 0  # Для отслеживания последней тысячи очков
@@ -401,46 +1861,228 @@ class Game:
         self.max_blinks = 4         # Количество подмигиваний
         self.blink_interval = 100   # Интервал между сменой состояния (в мс)
 
-    def reset_game_state(self):
-        """Сбрасывает состояние игры"""
-        self.dino = Dino()
-        self.obstacles = []
-        self.clouds = []
-        self.lands = []
-        self.pterodactyls = []
+    def reset_game_state(self, seed=None):
+        """Сбрасывает состояние игры (и генератор, если передано зерно)"""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.dino = Dino(sound_enabled=self.audio)
+        self.obstacles.clear()
+        self.clouds.clear()
+        self.pterodactyls.clear()
         self.score = 0
         self.initialize_land()
+        # У трассы свое зерно из генератора игры: одно зерно - одна игра
+        self.course = Course(self.rng.getrandbits(64), self.initial_game_speed,
+                             self.speed_increment, self.max_game_speed)
         self.is_game_over = False
+        self.crash_cause = None  # Тип препятствия, о которое разбился динозавр
+        self.motion = None
         self.game_speed = self.initial_game_speed  # Сброс скорости при перезапуске
 
+    def reset_episode(self, seed=None):
+        """Полный сброс для независимых эпизодов
+
+        Перезапуск игроком сохраняет время суток и часы, поэтому кроме
+        reset_game_state здесь сбрасываются цикл дня и ночи, мигание счета,
+        номер кадра и симулированное время: игра с одним зерном всегда
+        начинается одинаково.
+        """
+        self.reset_game_state(seed)
+        self.current_cycle = 0
+        self.is_night = False
+        self.transition_progress = 0
+        self.last_point_score = 0
+        self.score_blinking = False
+        self.blink_count = 0
+        self.blink_visible = True
+        self.frame = 0
+        self.sim_ticks = 0
+        self.last_time = self.get_ticks()
+
+    def layers(self):
+        """Слои объектов по именам (для debug и статистики)"""
+        return {
+            "cactus": self.obstacles,
+            "cloud": self.clouds,
+            "pterodactyl": self.pterodactyls,
+        }
+
+    def get_ticks(self):
+        """Текущее время в мс по симулированным часам"""
+        return self.sim_ticks
+
+    def step(self, frame_ms=TICK_MS):
+        """Один шаг симуляции по симулированным часам без отрисовки"""
+        self.sim_ticks += frame_ms
+        # Длина шага передается точно: разность показаний часов с дробными
+        # мс дрожит, и удержание прыжка кончалось бы на тик раньше таблицы
+        self.update(frame_ms / 1000.0)
+        self.frame += 1
+
+    def simulate(self, max_frames, frame_ms=1000 / FPS, fast_forward=False):
+        """Прогоняет игру без окна и ограничения FPS до проигрыша или лимита кадров
+
+        С fast_forward спокойные участки проматываются пачками (см. fast_forward).
+        Возвращает количество выполненных кадров.
+        """
+        frames = 0
+        while frames < max_frames and not self.is_game_over:
+            if fast_forward:
+                skipped = self.fast_forward(max_frames - frames, frame_ms)
+                if skipped:
+                    frames += skipped
+                    continue
+            self.step(frame_ms)
+            frames += 1
+        return frames
+
+    def quiet_ticks(self, max_ticks):
+        """Сколько следующих тиков гарантированно ничего не происходит
+
+        Спокойный тик: динозавр стоит на земле, ни один объект не касается
+        его, автопилот ни на что не реагирует, счет не пересекает тысячу.
+        Движение объектов за max_ticks тиков проверяется swept AABB с
+        наибольшей возможной за это время скоростью, поэтому быстрые объекты
+        не могут проскочить сквозь динозавра между проверками.
+        """
+        dino = self.dino
+        if (max_ticks <= 0 or self.is_game_over or dino.is_crashed or
+                dino.is_jumping or dino.velocity != 0 or dino.rect.bottom != SCREEN_HEIGHT or
+                self.score_blinking):
+            return 0
+        # Тик, на котором счет доходит до тысячи, играет звук и запускает мигание.
+        # Окно не длиннее секунды, чтобы оценка скорости оставалась точной
+        ticks = min(max_ticks, FPS, (self.score // 1000 + 1) * 1000 - self.score - 1)
+        if ticks <= 0:
+            return 0
+
+        top_speed = min(self.max_game_speed, max(self.game_speed,
+                        self.initial_game_speed + (self.score + ticks) * self.speed_increment))
+        if dino.auto_mode:
+            # Автопилот смотрит на все объекты впереди на любой высоте
+            reach = int(dino.jump_reach(top_speed)) + 1
+            target = pygame.Rect(dino.rect.left, 0, dino.rect.width + reach, SCREEN_HEIGHT)
+        else:
+            target = dino.rect
+        window = ticks
+        cactus_shift = scroll_shift(top_speed) * window
+        ptero_shift = scroll_shift(top_speed + Pterodactyl.speed) * window
+        candidates = [(rect, cactus_shift) for rect in self.obstacles.rects()]
+        candidates.extend((rect, ptero_shift) for rect in self.pterodactyls.rects())
+        # Объекты, которые трасса выпустит у правого края за это время; с
+        # запасом считается, что они движутся все окно
+        for event in self.course.peek_until(self.score + window):
+            if event.kind == Course.CACTUS:
+                candidates.append((pygame.Rect(SCREEN_WIDTH, event.y, event.width, event.height),
+                                   cactus_shift))
+            elif event.kind == Course.PTERODACTYL:
+                candidates.append((pygame.Rect(SCREEN_WIDTH, event.y, event.width, event.height),
+                                   ptero_shift))
+        for rect, shift in candidates:
+            if rect.right <= target.left:
+                continue  # Уже позади и только удаляется
+            enter = swept_aabb(rect, -shift, 0, target)
+            if enter is not None:
+                # Объект не может коснуться цели раньше тика enter * window
+                ticks = min(ticks, math.ceil(enter * window) - 1)
+                if ticks <= 0:
+                    return 0
+        return ticks
+
+    def fast_forward(self, max_ticks, frame_ms=1000 / FPS):
+        """Проматывает спокойные тики одним шагом переменной длины
+
+        Результат совпадает с тем же числом вызовов step(): случайные числа
+        берутся в том же порядке, счет, скорость и цикл дня и ночи считаются
+        по тикам, но объекты сдвигаются один раз на накопленное смещение.
+        Возвращает число промотанных тиков (0 - нужен обычный step).
+        """
+        ticks = self.quiet_ticks(max_ticks)
+        if ticks <= 0:
+            return 0
+
+        # Смещение класса объектов с начала промотки; у новых объектов
+        # запоминается смещение и тик появления
+        cloud_offset = cactus_offset = ptero_offset = 0
+        born = {}
+        ground = self.ground
+        course = self.course
+        done = 0
+        while done < ticks:
+            speed = self.game_speed
+            next_speed = speed
+            if speed < self.max_game_speed:
+                next_speed = min(self.max_game_speed,
+                                 self.initial_game_speed + (self.score + 1) * self.speed_increment)
+            if is_half_shift(speed) or is_half_shift(next_speed + Pterodactyl.speed):
+                break  # Такой тик сдвигает объекты за левым краем иначе
+            self.sim_ticks += frame_ms
+            done += 1
+
+            cloud_offset += 2
+            # Земля: чанки, ушедшие за экран, удаляются после промотки
+            ground.offset += scroll_shift(speed)
+            ground.fill()
+            cactus_offset += scroll_shift(speed)
+
+            # Появление объектов - продвижение курсора трассы
+            if course.next_tick() <= self.score:
+                for kind, entity_id in self.spawn_due():
+                    if kind == Course.CACTUS:
+                        born[kind, entity_id] = (cactus_offset, done)
+                    elif kind == Course.CLOUD:
+                        born[kind, entity_id] = (cloud_offset, done)
+                    else:
+                        born[kind, entity_id] = (ptero_offset, done)
+
+            self.score += 1
+            self.game_speed = next_speed
+            self.advance_day_night()
+            ptero_offset += scroll_shift(next_speed + Pterodactyl.speed)
+            self.frame += 1
+
+        if done == 0:
+            return 0
+        ground.scroll(0)
+        self.last_time = self.sim_ticks
+        # Промотка не оставляет одного тика, между которым можно интерполировать
+        self.motion = None
+        dino = self.dino
+        dino.animation_count = (dino.animation_count + done) % (len(dino.walk_images) * 10)
+        dino.image = dino.walk_images[dino.animation_count // 10]
+        dino.current_game_speed = self.game_speed
+
+        # Весь слой сдвигается на накопленное смещение, а новые объекты
+        # возвращаются на смещение, накопленное до их появления
+        for layer, offset in ((self.clouds, cloud_offset), (self.obstacles, cactus_offset),
+                              (self.pterodactyls, ptero_offset)):
+            layer.shift(offset)
+        self.pterodactyls.animate(done)
+        for (kind, entity_id), (start_offset, start_tick) in born.items():
+            layer = self.layers()[kind]
+            layer.x[layer.slot(entity_id)] += start_offset
+            if kind == Course.PTERODACTYL:
+                layer.set_frame(entity_id, done - start_tick + 1)
+        for layer in (self.clouds, self.obstacles, self.pterodactyls):
+            layer.cull()
+
+        # Ближайшее препятствие впереди, как его запомнил бы should_jump
+        if dino.auto_mode and (self.obstacles or self.pterodactyls):
+            ahead = [entity for entity in (self.obstacles.first_ahead(dino.rect.right),
+                                           self.pterodactyls.first_ahead(dino.rect.right))
+                     if entity is not None]
+            dino.next_obstacle = min(ahead, key=lambda entity: entity.rect.left, default=None)
+        return done
+
     def invert_surface_keeping_alpha(self, surface):
         """Инвертирует цвета спрайта, сохраняя прозрачность"""
-        # Создаем новую поверхность с поддержкой альфа-канала
-        inv = pygame.Surface(surface.get_rect().size, pygame.SRCALPHA)
-        
-        # Получаем доступ к пиксельным данным
-        for x in range(surface.get_width()):
-            for y in range(surface.get_height()):
-                color = surface.get_at((x, y))
-                # Инвертируем только если пиксель не прозрачный
-                if color.a > 0:
-                    inv.set_at((x, y), (255, 255, 255, color.a))
-                else:
-                    inv.set_at((x, y), (0, 0, 0, 0))
-        return inv
+        return invert_surface_keeping_alpha(surface)
 
     def apply_night_effect(self, surface):
-        """Применяет эффект ночи к поверхности"""
+        """Применяет эффект ночи к поверхности (через кэш ночных спрайтов)"""
         if self.transition_progress > 0:
-            # Создаем копию с сохранением альфа-канала
-            result = surface.copy()
-            # Создаем инвертированную версию с сохранением прозрачности
-            night_surface = self.invert_surface_keeping_alpha(surface)
-            # Устанавливаем прозрачность для плавного перехода
-            night_surface.set_alpha(int(255 * self.transition_progress))
-            # Накладываем ночной эффект
-            result.blit(night_surface, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-            return result
+            with self.profiler.section("draw.night_effect"):
+                return self.night_cache.get(surface, self.transition_progress)
         return surface
 
     def get_current_background_color(self):
@@ -452,62 +2094,81 @@ class Game:
 
     def initialize_land(self):
         """Создаем начальную землю с правильными размерами"""
-        self.lands.clear()
-        x = 0
-        
-        # Заполняем экран элементами земли
-        while x < SCREEN_WIDTH + 200:  # Добавляем запас справа
-            is_bump = random.random() < 0.1  # 10% шанс появления бугорка
-            land = Land(x, is_bump)
-            self.lands.append(land)
-            # Следующий элемент начинается там, где заканчивается текущий
-            x = land.rect.right
-
-    def spawn_obstacle(self):
-        if len(self.obstacles) == 0 or self.obstacles[-1].rect.right < SCREEN_WIDTH - 300:
-            height = 40  # Фиксированная высота
-            width = 20   # Фиксированная ширина
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            image_path = os.path.join(current_dir, "images", "obstical_cactus.png")
-            obstacle = GameObject(
-                SCREEN_WIDTH, 
-                SCREEN_HEIGHT - height,
-                width, 
-                height, 
-                image_path
-            )
-            self.obstacles.append(obstacle)
+        self.ground.reset()
+
+    def spawn_due(self):
+        """Создает объекты, чьи события трассы наступают на этом тике
+
+        Возвращает пары (вид, id) созданных объектов.
+        """
+        spawned = []
+        course = self.course
+        while course.next_tick() <= self.score:
+            event = course.pop()
+            if event.kind == Course.CACTUS:
+                entity_id = self.add_obstacle(event)
+            elif event.kind == Course.CLOUD:
+                entity_id = self.add_cloud(event)
+            else:
+                entity_id = self.add_pterodactyl(event)
+            spawned.append((event.kind, entity_id))
+        return spawned
+
+    def add_obstacle(self, event):
+        return self.obstacles.spawn(SCREEN_WIDTH, event.y, event.width, event.height)
 
-    def spawn_cloud(self):
-        if len(self.clouds) == 0 or self.clouds[-1].rect.right < SCREEN_WIDTH - 300:
-            y = random.randint(20, 80)
-            self.clouds.append(Cloud(SCREEN_WIDTH, y))
+    def add_cloud(self, event):
+        return self.clouds.spawn(SCREEN_WIDTH, event.y, event.width, event.height)
 
     def spawn_land(self):
         """Добавляем новые элементы земли, сохраняя непрерывность"""
-        if not self.lands:
-            self.initialize_land()
-            return
-
-        # Находим самый правый элемент
-        rightmost = max(self.lands, key=lambda x: x.rect.right)
-        
-        # Добавляем новые элементы до тех пор, пока не будет достаточного запаса справа
-        while rightmost.rect.right < SCREEN_WIDTH + 200:
-            is_bump = random.random() < 0.1
-            new_land = Land(rightmost.rect.right, is_bump)
-            self.lands.append(new_land)
-            rightmost = new_land
-
-    def spawn_pterodactyl(self):
-        """Создает нового птеродактиля"""
-        # Создаем птеродактиля только если прошли 500 очков и с вероятностью 1%
-        if (self.score > 500 and 
-            (len(self.pterodactyls) == 0 or self.pterodactyls[-1].rect.right < SCREEN_WIDTH - 400) and
-            random.random() < 0.01):
-            self.pterodactyls.append(Pterodactyl())
-
-    def update(self):
+        self.ground.fill()
+
+    def add_pterodactyl(self, event):
+        return self.pterodactyls.spawn(SCREEN_WIDTH, event.y, event.width, event.height)
+
+    def upcoming(self, count, kinds=None):
+        """Следующие count событий трассы (объекты, которых еще нет на экране)
+
+        kinds - только события этих видов, например без облаков.
+        """
+        return self.course.peek(count, kinds)
+
+    def upcoming_until(self, ticks):
+        """События трассы в ближайшие ticks тиков: пары (тиков до появления, событие)"""
+        score = self.score
+        return [(event.tick - score, event) for event in self.course.peek_until(score + ticks)]
+
+    def find_collision(self, layer):
+        """Первый объект слоя, который касается динозавра непрозрачными пикселями
+
+        Слои всегда отсортированы по x: новые объекты появляются у правого
+        края, а все объекты одного вида сдвигаются на одинаковую величину.
+        Поэтому перебор (broadphase) останавливается на первом объекте
+        правее динозавра, а маски сравниваются только для пересекающихся
+        прямоугольников. Возвращает снимок объекта (Entity) или None.
+        """
+        dino_rect = self.dino.rect
+        # Чаще всего ближайший объект слоя еще далеко впереди
+        if not layer or layer.x[layer.head] >= dino_rect.right:
+            return None
+        dino_mask = None
+        for entity_id, x, y, width, height, frame in layer.rows():
+            if x >= dino_rect.right:
+                break
+            rect = pygame.Rect(x, y, width, height)
+            if not dino_rect.colliderect(rect):
+                continue
+            if dino_mask is None:
+                dino_mask = assets.mask(self.dino.image)
+            offset = (x - dino_rect.x, y - dino_rect.y)
+            if dino_mask.overlap(assets.mask(layer.sprite(width, height, frame)), offset):
+                return Entity(layer, entity_id, rect, frame)
+        return None
+
+    def update(self, dt=None):
+        """Один тик игры; dt - длина шага в секундах (по умолчанию по часам игры)"""
+        self.motion = None
         if self.dino.is_crashed and not self.is_game_over:
             self.is_game_over = True
             self.die_sound.play()  # Воспроизводим звук при проигрыше
@@ -519,39 +2180,41 @@ class Game:
             self.reset_button_rect.centery = SCREEN_HEIGHT // 2 + 32
         
         if not self.is_game_over:
-            current_time = pygame.time.get_ticks()
-            dt = (current_time - self.last_time) / 1000.0
+            current_time = self.get_ticks()
+            if dt is None:
+                dt = (current_time - self.last_time) / 1000.0
             self.last_time = current_time
             
-            self.dino.update(dt)
+            profiler = self.profiler
+            self.motion = (self.game_speed, self.dino.rect.y)
+            with profiler.section("update.dino"):
+                self.dino.update(dt)
             
             # Обновление облаков
-            for cloud in self.clouds[:]:
-                cloud.rect.x -= 2  # Облака двигаются медленнее
-                if cloud.rect.right < 0:
-                    self.clouds.remove(cloud)
+            with profiler.section("update.clouds"):
+                self.clouds.shift(Cloud.speed)  # Облака двигаются медленнее
+                self.clouds.cull()
             
             # Обновление земли
-            for land in self.lands[:]:
-                land.rect.x -= self.game_speed
-                # Удаляем только те сегменты, которые полностью ушли за экран
-                if land.rect.right < -self.land_width:
-                    self.lands.remove(land)
-            
-            # Проверяем необходимость добавления новых сегментов
-            self.spawn_land()
+            with profiler.section("update.land"):
+                self.ground.scroll(self.game_speed)
+                
+                # Проверяем необходимость добавления новых сегментов
+                self.spawn_land()
             
             # Обновление препятствий
-            for obstacle in self.obstacles[:]:
-                obstacle.rect.x -= self.game_speed
-                if obstacle.rect.right < 0:
-                    self.obstacles.remove(obstacle)
-                if self.dino.rect.colliderect(obstacle.rect):
+            with profiler.section("update.obstacles"):
+                self.obstacles.scroll(self.game_speed)
+                self.obstacles.cull()
+
+            with profiler.section("update.collisions"):
+                if self.find_collision(self.obstacles) is not None:
+                    if not self.dino.is_crashed:
+                        self.crash_cause = "cactus"
                     self.dino.crash()
 
-            self.spawn_obstacle()
-            self.spawn_cloud()
-            self.spawn_pterodactyl()
+            with profiler.section("update.spawn"):
+                self.spawn_due()
             self.score += 1
 
             # Увеличиваем скорость игры
@@ -584,24 +2247,18 @@ class Game:
                         self.score_blinking = False
                         self.blink_visible = True
 
-            # Обновление цикла дня и ночи
-            self.current_cycle = (self.current_cycle + 1) % self.day_night_cycle
-            if self.current_cycle == 0:
-                self.is_night = not self.is_night
-
-            # Обновление перехода
-            target = 1.0 if self.is_night else 0.0
-            if self.transition_progress < target:
-                self.transition_progress = min(1.0, self.transition_progress + self.transition_speed)
-            elif self.transition_progress > target:
-                self.transition_progress = max(0.0, self.transition_progress - self.transition_speed)
+            self.advance_day_night()
 
             # Обновление птеродактилей
-            for ptero in self.pterodactyls[:]:
-                ptero.update(self.game_speed)
-                if ptero.rect.right < 0:
-                    self.pterodactyls.remove(ptero)
-                if self.dino.rect.colliderect(ptero.rect):
+            with profiler.section("update.pterodactyls"):
+                self.pterodactyls.scroll(self.game_speed + Pterodactyl.speed)
+                self.pterodactyls.animate()
+                self.pterodactyls.cull()
+
+            with profiler.section("update.collisions"):
+                if self.find_collision(self.pterodactyls) is not None:
+                    if not self.dino.is_crashed:
+                        self.crash_cause = "pterodactyl"
                     self.dino.crash()
 
             # Обновляем текущую скорость игры для динозавра
@@ -609,11 +2266,25 @@ class Game:
 
             # Автоматическое управление
             if self.dino.auto_mode and not self.dino.is_crashed:
-                if self.dino.should_jump(self.obstacles, self.pterodactyls):
-                    self.dino.start_jump()
-                elif (self.dino.is_jumping and
-                      self.dino.jump_time >= self.dino.auto_jump_duration):
-                    self.dino.stop_jump()
+                with profiler.section("update.autopilot"):
+                    if self.dino.should_jump(self.obstacles, self.pterodactyls, self.upcoming_until):
+                        self.dino.start_jump()
+                    elif (self.dino.is_jumping and
+                          self.dino.jump_time >= self.dino.auto_jump_duration):
+                        self.dino.stop_jump()
+
+    def advance_day_night(self):
+        """Один тик цикла дня и ночи и плавного перехода между ними"""
+        self.current_cycle = (self.current_cycle + 1) % self.day_night_cycle
+        if self.current_cycle == 0:
+            self.is_night = not self.is_night
+
+        # Обновление перехода
+        target = 1.0 if self.is_night else 0.0
+        if self.transition_progress < target:
+            self.transition_progress = min(1.0, self.transition_progress + self.transition_speed)
+        elif self.transition_progress > target:
+            self.transition_progress = max(0.0, self.transition_progress - self.transition_speed)
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -622,25 +2293,41 @@ class Game:
             elif event.type == pygame.KEYDOWN:
                 if self.is_game_over:
                     # Перезапускаем игру при нажатии любой клавиши в состоянии Game Over
-                    self.reset_game_state()
+                    self.perform_action(ACTION_RESTART)
                 elif event.key in [pygame.K_SPACE, pygame.K_UP]:
-                    self.dino.start_jump()
+                    self.perform_action(ACTION_JUMP_PRESS)
                 elif event.key == pygame.K_t:
-                    self.is_night = not self.is_night
+                    self.perform_action(ACTION_TOGGLE_NIGHT)
                 elif event.key == pygame.K_F3:
                     self.show_debug = not self.show_debug
                 elif event.key == pygame.K_m:
                     self.show_advanced_debug = not self.show_advanced_debug
                 elif event.key == pygame.K_n:
-                    self.dino.auto_mode = not self.dino.auto_mode
-                    self.show_vision = self.dino.auto_mode
+                    self.perform_action(ACTION_TOGGLE_AUTO)
             elif event.type == pygame.KEYUP:
                 if event.key in [pygame.K_SPACE, pygame.K_UP]:
-                    self.dino.stop_jump()
+                    self.perform_action(ACTION_JUMP_RELEASE)
             elif event.type == pygame.MOUSEBUTTONDOWN and self.is_game_over:
                 # Оставляем возможность перезапуска по клику на кнопку
                 if self.reset_button_rect.collidepoint(event.pos):
-                    self.reset_game_state()
+                    self.perform_action(ACTION_RESTART)
+
+    def perform_action(self, action):
+        """Применяет действие игрока и записывает его, если идет запись"""
+        if self.recording is not None:
+            self.recording.record(self.frame, action)
+
+        if action == ACTION_JUMP_PRESS:
+            self.dino.start_jump()
+        elif action == ACTION_JUMP_RELEASE:
+            self.dino.stop_jump()
+        elif action == ACTION_TOGGLE_NIGHT:
+            self.is_night = not self.is_night
+        elif action == ACTION_TOGGLE_AUTO:
+            self.dino.auto_mode = not self.dino.auto_mode
+            self.show_vision = self.dino.auto_mode
+        elif action == ACTION_RESTART:
+            self.reset_game_state()
 
     def draw_hitbox(self, surface, rect, color=(255, 0, 0)):
         """Отрисовка хитбокса объекта"""
@@ -655,7 +2342,7 @@ class Game:
         y_offset = 0
         
         for info in info_list:
-            text_surface = self.debug_font.render(info, True, text_color)
+            text_surface = self.text_cache.render(self.debug_font, info, text_color)
             self.screen.blit(text_surface, (obj.rect.right + 5, obj.rect.top + y_offset))
             y_offset += 10
 
@@ -664,6 +2351,7 @@ class Game:
         if not self.show_debug:
             return
             
+        stats = self.profiler.stats()
         debug_info = [
             f"FPS: {int(self.clock.get_fps())}",
             f"Jump Velocity: {self.dino.velocity:.2f}",
@@ -672,6 +2360,11 @@ class Game:
             f"Score: {self.score}",
             f"Objects: {len(self.obstacles) + len(self.pterodactyls)}",
         ]
+        if "frame" in stats:
+            p50, p95, p99 = stats["frame"]
+            debug_info.append(f"Frame ms: {p50:.1f}/{p95:.1f}/{p99:.1f}")
+        if self.dirty_rects:
+            debug_info.append(f"Dirty: {self.dirty_fraction * 100:.0f}%")
         
         if self.show_advanced_debug:
             debug_info.extend([
@@ -682,6 +2375,17 @@ class Game:
                 f"Auto Jump Power: {self.dino.auto_jump_power:.1f}",
                 f"Auto Jump Duration: {self.dino.auto_jump_duration}"
             ])
+            # Заполненность слоев: живые/емкость массивов, сколько всего создано
+            # и сколько раз массивы выделялись заново (замена счетчиков пулов)
+            for name, layer in self.layers().items():
+                layer_stats = layer.stats()
+                debug_info.append(
+                    f"Layer {name}: {layer_stats['live']}/{layer_stats['capacity']} spawned {layer_stats['spawned']} grown {layer_stats['grown']}"
+                )
+            # p95 по секциям кадра
+            for name in PROFILE_SECTIONS:
+                if name in stats:
+                    debug_info.append(f"{name} p95: {stats[name][1]:.2f}")
         
         # Объединяем все строки в одну с переносами
         debug_text = "\n".join(debug_info)
@@ -692,10 +2396,10 @@ class Game:
         # Разбиваем текст на строки для отрисовки
         y = 10  # Отступ сверху
         for line in debug_text.split('\n'):
-            debug_surface = self.debug_font.render(line, True, text_color)
+            debug_surface = self.text_cache.render(self.debug_font, line, text_color)
             # Позиционируем текст справа с отступом 10 пикселей
             x = SCREEN_WIDTH - debug_surface.get_width() - 10
-            self.screen.blit(debug_surface, (x, y))
+            self.text_rects.append(self.screen.blit(debug_surface, (x, y)))
             y += debug_surface.get_height()
 
     def draw_vision_line(self):
@@ -705,50 +2409,157 @@ class Game:
             end_pos = (self.dino.next_obstacle.rect.left, self.dino.next_obstacle.rect.centery)
             pygame.draw.line(self.screen, (0, 255, 0), start_pos, end_pos, 2)
 
-    def draw(self):
+    def needs_full_redraw(self):
+        """Нужна ли полная перерисовка вместо грязных прямоугольников"""
+        return (not self.dirty_rects or
+                self.previous_dirty is None or
+                # Во время смены дня и ночи меняется цвет всего фона
+                0 < self.transition_progress < 1 or
+                self.is_game_over or
+                self.show_advanced_debug or
+                self.show_vision)
+
+    def collect_dirty_rects(self):
+        """Прямоугольники всего, что нарисовано в текущем кадре"""
+        cloud_dx, cactus_dx, ptero_dx, dino_y = self.draw_offsets
+        rects = [pygame.Rect(x + cloud_dx, y, width, height)
+                 for _, x, y, width, height, _ in self.clouds.rows()]
+        rects.append(pygame.Rect(0, GroundStrip.TOP, SCREEN_WIDTH, GroundStrip.HEIGHT))
+        rects.append(self.dino.rect.move(0, dino_y - self.dino.rect.y))
+        for layer, dx in ((self.obstacles, cactus_dx), (self.pterodactyls, ptero_dx)):
+            rects.extend(pygame.Rect(x + dx, y, width, height)
+                         for _, x, y, width, height, _ in layer.rows())
+        rects.extend(self.text_rects)
+        return rects
+
+    def interpolate(self, alpha):
+        """Смещения отрисовки между двумя последними тиками
+
+        alpha - доля следующего тика, уже прошедшая по реальным часам: при 1
+        объекты рисуются в текущем состоянии, при 0 - в предыдущем.
+        Возвращает (dx облаков, dx кактусов и земли, dx птеродактилей, y динозавра).
+        """
+        if self.motion is None or alpha >= 1:
+            return 0, 0, 0, self.dino.rect.y
+        speed, dino_prev_y = self.motion
+        # За тик объекты уходят влево, поэтому прошлое положение правее текущего
+        back = 1 - alpha
+        dino_y = self.dino.rect.y
+        return (round(2 * back), round(speed * back),
+                round((speed + Pterodactyl.speed) * back),
+                round(dino_y + (dino_prev_y - dino_y) * back))
+
+    def draw_layer(self, layer, dx):
+        """Рисует объекты слоя со смещением dx"""
+        blit, night = self.screen.blit, self.apply_night_effect
+        sprite = layer.sprite
+        for _, x, y, width, height, frame in layer.rows():
+            blit(night(sprite(width, height, frame)), (x + dx, y))
+
+    def draw(self, alpha=1.0):
+        profiler = self.profiler
+        full_redraw = self.needs_full_redraw()
+        self.text_rects = []
+        self.draw_offsets = cloud_dx, cactus_dx, ptero_dx, dino_y = self.interpolate(alpha)
         # Заливаем фон текущим цветом
-        self.screen.fill(self.get_current_background_color())
+        with profiler.section("draw.background"):
+            background = self.get_current_background_color()
+            if full_redraw:
+                self.screen.fill(background)
+            else:
+                # Стираем только места, где объекты были в прошлом кадре
+                for rect in self.previous_dirty:
+                    self.screen.fill(background, rect)
         
         # Рисуем облака
-        for cloud in self.clouds:
-            cloud_surface = cloud.image.copy()
-            if self.transition_progress > 0:
-                cloud_surface = self.apply_night_effect(cloud_surface)
-            self.screen.blit(cloud_surface, cloud.rect)
+        with profiler.section("draw.clouds"):
+            self.draw_layer(self.clouds, cloud_dx)
         
         # Рисуем землю
-        for land in self.lands:
-            land_surface = land.image.copy()
-            if self.transition_progress > 0:
-                land_surface = self.apply_night_effect(land_surface)
-            self.screen.blit(land_surface, land.rect)
+        with profiler.section("draw.land"):
+            self.ground.draw(self.screen, self.apply_night_effect, cactus_dx)
         
         # Рисуем динозавра
-        dino_surface = self.dino.image.copy()
-        if self.transition_progress > 0:
-            dino_surface = self.apply_night_effect(dino_surface)
-        self.screen.blit(dino_surface, self.dino.rect)
+        with profiler.section("draw.dino"):
+            self.screen.blit(self.apply_night_effect(self.dino.image), (self.dino.rect.x, dino_y))
         
         # Рисуем препятствия
-        for obstacle in self.obstacles:
-            obstacle_surface = obstacle.image.copy()
-            if self.transition_progress > 0:
-                obstacle_surface = self.apply_night_effect(obstacle_surface)
-            self.screen.blit(obstacle_surface, obstacle.rect)
+        with profiler.section("draw.obstacles"):
+            self.draw_layer(self.obstacles, cactus_dx)
 
         # Рисуем птеродактилей
-        for ptero in self.pterodactyls:
-            ptero_surface = ptero.image.copy()
-            if self.transition_progress > 0:
-                ptero_surface = self.apply_night_effect(ptero_surface)
-            self.screen.blit(ptero_surface, ptero.rect)
+        with profiler.section("draw.pterodactyls"):
+            self.draw_layer(self.pterodactyls, ptero_dx)
 
         # Отображение счета с учетом подмигивания
-        score_color = self.sprite_day_color if self.transition_progress < 0.5 else self.sprite_night_color
-        if not self.score_blinking or self.blink_visible:
-            score_text = self.font.render(f'Score: {self.score}', True, score_color)
-            self.screen.blit(score_text, (10, 10))
+        with profiler.section("draw.score"):
+            score_color = self.sprite_day_color if self.transition_progress < 0.5 else self.sprite_night_color
+            if not self.score_blinking or self.blink_visible:
+                # Счет собирается из готовых глифов цифр
+                self.text_rects.append(
+                    self.glyphs.draw(self.screen, self.font, 'Score: ', self.score, score_color, (10, 10))
+                )
+
+        with profiler.section("draw.debug"):
+            self.draw_debug_overlays()
 
+        # Отрисовка Game Over экрана поверх всего остального
+        if self.is_game_over:
+            # Рисуем спрайт Game Over
+            self.screen.blit(self.apply_night_effect(self.game_over_sprite), self.game_over_rect)
+            
+            # Рисуем кнопку перезапуска
+            self.screen.blit(self.apply_night_effect(self.reset_button), self.reset_button_rect)
+
+        current_dirty = self.collect_dirty_rects() if self.dirty_rects else None
+        # В headless режиме окна нет, кадр остается на поверхности
+        if not self.headless:
+            with profiler.section("draw.flip"):
+                if full_redraw:
+                    pygame.display.flip()
+                else:
+                    rects = self.previous_dirty + current_dirty
+                    pygame.display.update(rects)
+        if self.dirty_rects:
+            if full_redraw:
+                self.dirty_fraction = 1.0
+            else:
+                self.dirty_fraction = self.screen_fraction(self.previous_dirty + current_dirty)
+            # После полной перерисовки на экране могут быть элементы без
+            # отслеживаемых прямоугольников (Game Over, хитбоксы), поэтому
+            # следующий кадр стирает весь экран
+            if full_redraw:
+                self.previous_dirty = [pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)]
+            else:
+                self.previous_dirty = current_dirty
+
+    @staticmethod
+    def screen_fraction(rects):
+        """Доля экрана, покрытая прямоугольниками (пересечения считаются один раз)"""
+        screen_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        rects = [rect.clip(screen_rect) for rect in rects]
+        # Площадь объединения по вертикальным полосам между границами по x
+        xs = sorted({x for rect in rects if rect.width and rect.height for x in (rect.left, rect.right)})
+        area = 0
+        for left, right in zip(xs, xs[1:]):
+            spans = sorted((rect.top, rect.bottom) for rect in rects
+                           if rect.height and rect.left <= left and rect.right >= right)
+            covered = 0
+            current_top = current_bottom = None
+            for top, bottom in spans:
+                if current_bottom is None or top > current_bottom:
+                    if current_bottom is not None:
+                        covered += current_bottom - current_top
+                    current_top, current_bottom = top, bottom
+                else:
+                    current_bottom = max(current_bottom, bottom)
+            if current_bottom is not None:
+                covered += current_bottom - current_top
+            area += covered * (right - left)
+        return area / (SCREEN_WIDTH * SCREEN_HEIGHT)
+
+    def draw_debug_overlays(self):
+        """Отрисовка debug информации, хитбоксов и линии зрения"""
         # Добавляем отрисовку debug информации
         self.draw_debug_info()
 
@@ -767,7 +2578,7 @@ class Game:
                 self.draw_hitbox(self.screen, ptero.rect, (255, 0, 0))
                 self.draw_object_info(ptero, [
                     f"pos: ({ptero.rect.x}, {ptero.rect.y})",
-                    f"speed: {ptero.speed + self.game_speed:.1f}"
+                    f"speed: {Pterodactyl.speed + self.game_speed:.1f}"
                 ])
 
             # Хитбоксы и информация о препятствиях
@@ -786,31 +2597,295 @@ class Game:
         if self.show_vision:
             self.draw_vision_line()
 
-        # Отрисовка Game Over экрана поверх всего остального
-        if self.is_game_over:
-            # Рисуем спрайт Game Over
-            game_over_surface = self.game_over_sprite.copy()
-            if self.transition_progress > 0:
-                game_over_surface = self.apply_night_effect(game_over_surface)
-            self.screen.blit(game_over_surface, self.game_over_rect)
-            
-            # Рисуем кнопку перезапуска
-            reset_surface = self.reset_button.copy()
-            if self.transition_progress > 0:
-                reset_surface = self.apply_night_effect(reset_surface)
-            self.screen.blit(reset_surface, self.reset_button_rect)
+    def run(self, report_startup=False):
+        profiler = self.profiler
+        first_frame = True
+        # Реальное время, еще не отработанное тиками симуляции
+        accumulator = 0.0
+        previous = time.perf_counter()
+        while self.running:
+            profiler.begin_frame()
+            with profiler.section("events"):
+                self.handle_events()
+            with profiler.section("update"):
+                if self.fixed_step:
+                    self.step()
+                    alpha = 1.0
+                else:
+                    # Игра идет тиками по TICK_MS при любой частоте кадров:
+                    # на быстром мониторе кадр может обойтись без тика, под
+                    # нагрузкой за кадр проходит несколько тиков
+                    now = time.perf_counter()
+                    accumulator += min((now - previous) * 1000, MAX_FRAME_MS)
+                    previous = now
+                    while accumulator >= TICK_MS:
+                        self.step()
+                        accumulator -= TICK_MS
+                    alpha = accumulator / TICK_MS
+            with profiler.section("draw"):
+                self.draw(alpha)
+            profiler.end_frame()
+            if first_frame:
+                # Время от начала импорта до первого показанного кадра
+                record_startup("first_frame", _import_started)
+                if report_startup:
+                    print(f"Старт: {startup_report()}")
+                first_frame = False
+            self.clock.tick(self.render_fps)
+
+        if self.recording is not None:
+            self.recording.finish(self.frame, self.score)
+        profiler.close()
+        pygame.quit()
 
-        pygame.display.flip()
+def run_headless(episodes=1, max_frames=100000, auto_mode=True, seed=None, fast_forward=False):
+    """Headless прогоны автопилота, возвращает список результатов"""
+    game = Game(headless=True, seed=seed)
+    results = []
+    for _ in range(episodes):
+        game.reset_game_state()
+        game.dino.auto_mode = auto_mode
+        started = time.perf_counter()
+        frames = game.simulate(max_frames, fast_forward=fast_forward)
+        elapsed = time.perf_counter() - started
+        results.append({
+            "score": game.score,
+            "frames": frames,
+            "crashed": game.dino.is_crashed,
+            "seconds": elapsed,
+            # Во сколько раз быстрее реального времени
+            "speedup": (frames / FPS) / elapsed if elapsed > 0 else float('inf'),
+        })
+    return results
+
+def check_jump_table(seeds, max_frames=20000):
+    """Сверяет траектории JumpTable с прыжками табличного автопилота в игре
+
+    Каждый прыжок, который автопилот довел до приземления, сравнивается
+    по тикам с JumpTable.trajectory для тех же силы и удержания: таблица
+    планирует прыжки именно по этим траекториям.
+    Возвращает (число прыжков, несовпадения (зерно, счет, сила, удержание)).
+    """
+    game = Game(headless=True)
+    jumps = 0
+    mismatches = []
+    for seed in seeds:
+        game.reset_episode(seed)
+        dino = game.dino
+        dino.auto_mode = True
+        dino.autopilot = 'table'
+        table = get_jump_table(dino)
+        jump = None  # (сила, удержание, y по тикам) текущего прыжка
+        frames = 0
+        while frames < max_frames and not game.is_game_over:
+            game.step()
+            frames += 1
+            if jump is not None and not dino.is_crashed:
+                jump[2].append(dino.rect.y)
+                # Приземление обнуляет jump_time; в том же тике автопилот
+                # может начать новый прыжок
+                if dino.jump_time == 0:
+                    power, duration, positions = jump
+                    jumps += 1
+                    if tuple(positions) != table.trajectory(dino, power, duration):
+                        mismatches.append((seed, game.score, power, duration))
+                    jump = None
+            # Прыжок начинается в конце тика автопилотом
+            if jump is None and dino.is_jumping:
+                jump = (dino.auto_jump_power, dino.auto_jump_duration, [])
+    return jumps, mismatches
+
+def replay(recording):
+    """Пересчитывает записанную игру headless на максимальной скорости
+
+    Возвращает (совпал ли итоговый счет, полученный счет).
+    """
+    game = Game(headless=True, seed=recording.seed)
+    events = recording.events
+    next_event = 0
+    frame = 0
+    while frame < recording.frames:
+        while next_event < len(events) and events[next_event][0] == frame:
+            game.perform_action(events[next_event][1])
+            next_event += 1
+        # До следующего действия игрока спокойные участки проматываются
+        until = recording.frames
+        if next_event < len(events):
+            until = min(until, events[next_event][0])
+        skipped = game.fast_forward(until - frame, recording.frame_ms)
+        if skipped:
+            frame += skipped
+            continue
+        game.step(recording.frame_ms)
+        frame += 1
+    return game.score == recording.final_score, game.score
+
+SPLASH_PATH = os.path.join(BASE_DIR, "assets", "splash-dino.png")
+
+def preload_entries():
+    """Спрайты, которые игра запрашивает при создании и в первые секунды"""
+    images = os.path.join(BASE_DIR, "images")
+    entries = [(os.path.join(images, name), 40, 43)
+               for name in ("dino_walk_1.png", "dino_walk_2.png", "dino_crash.png")]
+    entries += [
+        (Game.cactus_image_path, 20, 40),
+        (GroundStrip.bump_image_path, 60, 12),
+        (GroundStrip.normal_image_path, 100, 5),
+        (os.path.join(images, "game_over.png"), 250, 15),
+        (os.path.join(images, "replay_button.png"), 34, 30),
+    ]
+    entries += [(path, 40, 35) for path in Pterodactyl.fly_image_paths]
+    # Размер облака случайный: 60-65 на 20-25
+    entries += [(Cloud.image_path, width, height)
+                for width in range(60, 66) for height in range(20, 26)]
+    return entries
+
+class AssetLoader(threading.Thread):
+    """Фоновая загрузка спрайтов, шрифтов и звуков, пока показана заставка"""
+    def __init__(self, audio):
+        super().__init__(name="asset-loader", daemon=True)
+        self.audio = audio
+        self.error = None
 
     def run(self):
-        while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
-
-        pygame.quit()
+        started = time.perf_counter()
+        try:
+            assets.preload(preload_entries())
+            load_fonts()
+            if self.audio:
+                sounds.preload()
+            # Таблица прыжков табличного автопилота строится целиком заранее
+            # по физике класса Dino: спрайты в этом потоке не создаются
+            get_jump_table(Dino)
+        except Exception as e:
+            # Недогруженное загрузится лениво в основном потоке
+            self.error = e
+        record_startup("assets", started)
+
+def show_splash(screen):
+    """Заставка по центру белого экрана, вписанная в окно"""
+    screen.fill((255, 255, 255))
+    if os.path.exists(SPLASH_PATH):
+        image = pygame.image.load(SPLASH_PATH)
+        scale = min(SCREEN_WIDTH / image.get_width(), SCREEN_HEIGHT / image.get_height(), 1)
+        if scale < 1:
+            image = pygame.transform.smoothscale(
+                image.convert_alpha(),
+                (int(image.get_width() * scale), int(image.get_height() * scale)))
+        screen.blit(image, image.get_rect(center=screen.get_rect().center))
+    pygame.display.flip()
+
+def start_window(audio=True, **game_kwargs):
+    """Поэтапный старт окна: заставка сразу, ресурсы в фоне, затем игра
+
+    Возвращает Game или None, если окно закрыли во время загрузки.
+    """
+    started = time.perf_counter()
+    audio = init_window(audio)
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Chrome Dino Game")
+    show_splash(screen)
+    record_startup("splash", started)
+
+    loader = AssetLoader(audio)
+    loader.start()
+    waiting = time.perf_counter()
+    # Пока идет загрузка, окно продолжает отвечать
+    while loader.is_alive():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return None
+        loader.join(1 / 30)
+    if loader.error is not None:
+        print(f"Ошибка фоновой загрузки: {loader.error}")
+    record_startup("wait", waiting)
+
+    started = time.perf_counter()
+    game = Game(audio=audio, **game_kwargs)
+    record_startup("game", started)
+    return game
+
+def seed_argument(value):
+    """Зерно из командной строки: должно поместиться в заголовок записи (int64)"""
+    try:
+        seed = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"зерно должно быть целым числом: {value!r}")
+    if not -2 ** 63 <= seed < 2 ** 63:
+        raise argparse.ArgumentTypeError(f"зерно {value} не помещается в 64-битное целое со знаком")
+    return seed
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Chrome Dino Game")
+    parser.add_argument("--headless", action="store_true",
+                        help="симуляция автопилота без окна, звука и ограничения FPS")
+    parser.add_argument("--episodes", type=int, default=1,
+                        help="количество игр в headless режиме")
+    parser.add_argument("--frames", type=int, default=100000,
+                        help="максимум кадров на одну игру в headless режиме")
+    parser.add_argument("--seed", type=seed_argument, default=None,
+                        help="зерно генератора для повторяемой игры")
+    parser.add_argument("--fast-forward", action="store_true",
+                        help="в headless режиме проматывать спокойные участки пачками тиков")
+    parser.add_argument("--fixed-step", action="store_true",
+                        help="ровно один тик симуляции на кадр вместо тиков по реальному времени")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="частота отрисовки окна (0 - без ограничения); тики всегда идут с частотой %d" % FPS)
+    parser.add_argument("--record", metavar="PATH",
+                        help="записать ввод в файл (включает фиксированный шаг)")
+    parser.add_argument("--no-audio", action="store_true",
+                        help="играть без звука, не инициализируя микшер")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="обновлять на экране только изменившиеся области")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="писать время фаз каждого кадра в CSV или JSONL файл")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="воспроизвести запись headless и проверить итоговый счет")
+    parser.add_argument("--check-jump-table", action="store_true",
+                        help="сверить траектории таблицы прыжков с прыжками в игре "
+                             "(--episodes зерен начиная с --seed)")
+    parser.add_argument("--startup-times", action="store_true",
+                        help="вывести длительность фаз старта после первого кадра")
+    return parser.parse_args(argv)
+
+record_startup("import", _import_started)
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    args = parse_args()
+    if args.check_jump_table:
+        first = args.seed if args.seed is not None else 0
+        jumps, mismatches = check_jump_table(range(first, first + args.episodes), args.frames)
+        for seed, score, power, duration in mismatches:
+            print(f"Зерно {seed}, счет {score}: прыжок ({power}, {duration:.1f} мс) "
+                  f"не совпал с таблицей")
+        print(f"Прыжков: {jumps}, несовпадений с таблицей: {len(mismatches)}")
+        sys.exit(1 if mismatches else 0)
+    if args.replay:
+        recording = InputRecording.load(args.replay)
+        started = time.perf_counter()
+        matched, score = replay(recording)
+        print(f"Кадров: {recording.frames}, счет {score} (ожидался {recording.final_score}), "
+              f"{time.perf_counter() - started:.2f} с")
+        sys.exit(0 if matched else 1)
+    if args.headless:
+        for i, result in enumerate(run_headless(args.episodes, args.frames, seed=args.seed,
+                                                     fast_forward=args.fast_forward)):
+            print(f"Игра {i + 1}: счет {result['score']}, кадров {result['frames']}, "
+                  f"{result['seconds']:.2f} с (x{result['speedup']:.0f})")
+        sys.exit(0)
+    recording = None
+    if args.record:
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 63)
+        recording = InputRecording(seed)
+        args.seed = seed
+    game = start_window(audio=not args.no_audio, seed=args.seed,
+                        fixed_step=args.fixed_step or recording is not None,
+                        recording=recording, dirty_rects=args.dirty_rects, render_fps=args.fps)
+    if game is None:
+        sys.exit(0)
+    if args.profile_out:
+        game.profiler.open_output(args.profile_out)
+    game.run(report_startup=args.startup_times)
+    if recording is not None:
+        recording.save(args.record)
@@ -0,0 +1,210 @@
+"""Офлайн отрисовка записанной игры в видео.
+
+Запись (InputRecording, см. main.py --record) проигрывается headless:
+Game рисует каждый кадр на поверхности в памяти, без окна и без
+clock.tick, так что кадры идут с той скоростью, какую позволяет процессор.
+Готовые кадры уходят в приемник:
+
+- PngSequence - PNG файлы frame_000000.png, ...; сжатие PNG идет в пуле
+  процессов пачками кадров, пока основной процесс считает и рисует
+  следующие;
+- RawPipe - сырые кадры RGB24 подряд в файл или stdout, например для
+  ffmpeg; запись в трубу идет в отдельном потоке.
+
+    python render_video.py run.drec --png frames/ --workers 8
+    python render_video.py run.drec --raw - | ffmpeg -f rawvideo -pix_fmt rgb24 \\
+        -s 700x200 -r 60 -i - run.mp4
+"""
+import os
+
+# Окно и звук не нужны: выбираем заглушки SDL до импорта pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# stdout может быть трубой с кадрами: приветствие pygame туда не пишем
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+from PIL import Image
+
+import main
+
+FRAME_SIZE = (main.SCREEN_WIDTH, main.SCREEN_HEIGHT)
+
+
+def _encode_png_batch(directory, start, frames, compress_level):
+    """Сохраняет пачку кадров RGB24 как PNG (выполняется в процессе пула)"""
+    for index, data in enumerate(frames, start):
+        image = Image.frombytes("RGB", FRAME_SIZE, data)
+        image.save(os.path.join(directory, f"frame_{index:06d}.png"),
+                   compress_level=compress_level)
+    return len(frames)
+
+
+class PngSequence:
+    """Последовательность PNG, которую сжимает пул процессов.
+
+    Кадры копятся пачками по batch штук, чтобы на каждый кадр не
+    приходилось по отдельной задаче пула. В работе одновременно не больше
+    двух пачек на процесс: если сжатие не успевает за отрисовкой, write
+    ждет, и память не растет.
+    """
+    def __init__(self, directory, workers=None, batch=16, compress_level=1):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.batch = batch
+        self.compress_level = compress_level
+        self.workers = workers or os.cpu_count()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.pending = deque()
+        self.frames = []
+        self.start = 0  # Номер первого кадра текущей пачки
+
+    def write(self, data):
+        self.frames.append(data)
+        if len(self.frames) == self.batch:
+            self.submit()
+
+    def submit(self):
+        while len(self.pending) >= 2 * self.workers:
+            self.pending.popleft().result()
+        self.pending.append(self.pool.submit(
+            _encode_png_batch, self.directory, self.start, self.frames, self.compress_level))
+        self.start += len(self.frames)
+        self.frames = []
+
+    def close(self):
+        if self.frames:
+            self.submit()
+        while self.pending:
+            self.pending.popleft().result()
+        self.pool.shutdown()
+
+
+class RawPipe:
+    """Сырые кадры RGB24 подряд в поток; запись идет в отдельном потоке.
+
+    Очередь ограничена depth кадрами: если читатель трубы (ffmpeg) не
+    успевает, write ждет.
+    """
+    def __init__(self, stream, depth=64, owns_stream=False):
+        self.stream = stream
+        self.owns_stream = owns_stream
+        self.queue = queue.Queue(maxsize=depth)
+        self.error = None
+        self.thread = threading.Thread(target=self.drain, daemon=True)
+        self.thread.start()
+
+    def drain(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            if self.error is None:
+                try:
+                    self.stream.write(data)
+                except OSError as error:
+                    # Читатель закрыл трубу: дальше кадры только выбрасываются
+                    self.error = error
+
+    def write(self, data):
+        if self.error is not None:
+            raise self.error
+        self.queue.put(data)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        try:
+            if self.owns_stream:
+                self.stream.close()
+            elif self.error is None:
+                self.stream.flush()
+        except OSError as error:
+            self.error = self.error or error
+        if self.error is not None:
+            raise self.error
+
+
+def render_replay(recording, sink, show_debug=True, max_frames=None, progress=None):
+    """Проигрывает запись, рисуя каждый кадр и отдавая его в sink
+
+    Кадры считаются так же, как в main.replay, но без fast_forward:
+    нужен каждый кадр. progress(кадр, всего) вызывается раз в секунду
+    записи. Возвращает (число кадров, итоговый счет).
+    """
+    game = main.Game(headless=True, seed=recording.seed)
+    game.show_debug = show_debug
+    screen = game.screen
+    events = recording.events
+    total = recording.frames if max_frames is None else min(recording.frames, max_frames)
+    next_event = 0
+    for frame in range(total):
+        while next_event < len(events) and events[next_event][0] == frame:
+            game.perform_action(events[next_event][1])
+            next_event += 1
+        game.step(recording.frame_ms)
+        game.draw()
+        sink.write(pygame.image.tobytes(screen, "RGB"))
+        if progress is not None and frame % main.FPS == 0:
+            progress(frame, total)
+    return total, game.score
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Отрисовка записи игры в видео без окна")
+    parser.add_argument("recording", help="файл записи (main.py --record)")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--png", metavar="DIR", help="каталог для последовательности PNG")
+    output.add_argument("--raw", metavar="PATH",
+                        help="файл или '-' (stdout) для сырых кадров RGB24")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="процессов сжатия PNG (по умолчанию все ядра)")
+    parser.add_argument("--batch", type=int, default=16, help="кадров PNG на одну задачу пула")
+    parser.add_argument("--compress-level", type=int, default=1,
+                        help="уровень сжатия PNG 0-9 (больше - меньше файлы, дольше)")
+    parser.add_argument("--frames", type=int, default=None, help="отрисовать только первые N кадров")
+    parser.add_argument("--no-debug", action="store_true", help="не рисовать debug текст")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    recording = main.InputRecording.load(args.recording)
+    if args.png:
+        sink = PngSequence(args.png, args.workers, args.batch, args.compress_level)
+    elif args.raw == "-":
+        # Кадры идут в настоящий stdout, а сообщения игры (print) - в stderr
+        sys.stdout.flush()
+        frames_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        sink = RawPipe(frames_out, owns_stream=True)
+    else:
+        sink = RawPipe(open(args.raw, "wb"), owns_stream=True)
+
+    def progress(frame, total):
+        print(f"\rКадр {frame}/{total}", end="", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    try:
+        try:
+            frames, score = render_replay(recording, sink, not args.no_debug, args.frames, progress)
+        finally:
+            sink.close()
+    except BrokenPipeError:
+        # Читатель (head, ffmpeg) закрыл трубу раньше конца записи - это не ошибка
+        print("\nЧитатель закрыл трубу, отрисовка остановлена", file=sys.stderr)
+        sys.exit(0)
+    elapsed = time.perf_counter() - started
+    speedup = (frames / main.FPS) / elapsed if elapsed > 0 else float("inf")
+    # Отчет в stderr: stdout может быть трубой с кадрами
+    print(f"\rКадров: {frames}, счет {score}, {elapsed:.1f} с "
+          f"({frames / elapsed:.0f} кадров/с, x{speedup:.1f} реального времени), "
+          f"{FRAME_SIZE[0]}x{FRAME_SIZE[1]}", file=sys.stderr)
@@ -0,0 +1,222 @@
+"""Длительный прогон автопилота: поиск утечек памяти и замедления кадров.
+
+Игра headless крутит автопилот миллионы кадров подряд, как киоск, где
+автопилот работает сутками: после проигрыша игра сразу перезапускается,
+время суток при этом сохраняется, так что проходят десятки циклов дня и
+ночи. Каждый кадр рисуется (Game.draw) - именно отрисовка создает
+поверхности текста и ночные версии спрайтов.
+
+Раз в interval кадров снимается замер: память Python (tracemalloc), RSS
+процесса, живые объекты слоев, размеры кэшей и время кадра (медиана и
+p99 за интервал). Первый замер после прогрева (warmup) - опорный;
+прогон проваливается, если рост памяти, число объектов или замедление
+медианы кадра относительно опорного замера выходят за пределы limits.
+
+    python soak.py --frames 2000000 --interval 20000 --csv soak.csv
+"""
+import os
+
+# Окно и звук не нужны: выбираем заглушки SDL до импорта pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import csv
+import statistics
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import main
+
+# Полный цикл дня и ночи в кадрах (Game.day_night_cycle - половина цикла)
+CYCLE_FRAMES = 2 * 120 * main.FPS
+# Пределы по умолчанию: рост относительно опорного замера
+DEFAULT_LIMITS = {
+    "heap_growth_mb": 8.0,    # Память Python по tracemalloc
+    "rss_growth_mb": 64.0,    # RSS процесса (поверхности SDL tracemalloc не видит)
+    "entities": 64,           # Живых объектов во всех слоях одновременно
+    "frame_drift": 1.5,       # Во сколько раз медиана кадра может вырасти
+}
+
+
+def rss_mb():
+    """RSS процесса в МБ: текущий из /proc, иначе пиковый из resource, иначе None"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss в байтах на macOS и в КБ на остальных системах
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def take_sample(game, frame, frame_times, restarts, cycles):
+    """Замер состояния игры и процесса после frame кадров"""
+    frame_times.sort()
+    sample = {
+        "frame": frame,
+        "restarts": restarts,
+        "day_night_cycles": cycles,
+        "heap_mb": None,
+        "heap_peak_mb": None,
+        "rss_mb": rss_mb(),
+        "frame_median_us": statistics.median(frame_times) * 1e6,
+        "frame_p99_us": frame_times[int(len(frame_times) * 0.99)] * 1e6,
+    }
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        sample["heap_mb"] = current / 2**20
+        sample["heap_peak_mb"] = peak / 2**20
+        tracemalloc.reset_peak()
+    entities = 0
+    for name, layer in game.layers().items():
+        stats = layer.stats()
+        sample[f"{name}_live"] = stats["live"]
+        sample[f"{name}_capacity"] = stats["capacity"]
+        sample[f"{name}_grown"] = stats["grown"]
+        entities += stats["live"]
+    sample["entities"] = entities
+    sample["assets"] = main.assets.stats()["entries"]
+    sample["text_cache"] = game.text_cache.stats()["entries"]
+    sample["night_cache"] = len(game.night_cache.inverted) + len(game.night_cache.tinted)
+    return sample
+
+
+def run_soak(frames, interval=10000, seed=0, draw_every=1, trace=True, on_sample=None):
+    """Крутит автопилот frames кадров, возвращает список замеров
+
+    draw_every - рисовать каждый N-й кадр (1 - все, как в окне).
+    on_sample(замер) вызывается сразу после каждого замера.
+    """
+    if trace:
+        tracemalloc.start()
+    game = main.Game(headless=True, seed=seed)
+    game.dino.auto_mode = True
+    samples = []
+    frame_times = []
+    restarts = 0
+    cycles = 0
+    was_night = game.is_night
+    perf_counter = time.perf_counter
+    try:
+        for frame in range(1, frames + 1):
+            started = perf_counter()
+            if game.is_game_over:
+                # Киоск перезапускает игру сам; новый динозавр снова на автопилоте
+                game.perform_action(main.ACTION_RESTART)
+                game.dino.auto_mode = True
+                restarts += 1
+            game.step()
+            if frame % draw_every == 0:
+                game.draw()
+            frame_times.append(perf_counter() - started)
+            if game.is_night != was_night:
+                was_night = game.is_night
+                if not was_night:
+                    cycles += 1
+            if frame % interval == 0 or frame == frames:
+                samples.append(take_sample(game, frame, frame_times, restarts, cycles))
+                frame_times = []
+                if on_sample is not None:
+                    on_sample(samples[-1])
+    finally:
+        if trace:
+            tracemalloc.stop()
+    return samples
+
+
+def check_limits(samples, warmup, limits):
+    """Сравнивает замеры после прогрева с опорным, возвращает список нарушений"""
+    measured = [sample for sample in samples if sample["frame"] >= warmup]
+    if len(measured) < 2:
+        return [f"недостаточно замеров после прогрева ({warmup} кадров)"]
+    baseline = measured[0]
+    failures = []
+    for sample in measured:
+        frame = sample["frame"]
+        for key, limit_key in (("heap_mb", "heap_growth_mb"), ("rss_mb", "rss_growth_mb")):
+            if sample[key] is None or baseline[key] is None:
+                continue
+            growth = sample[key] - baseline[key]
+            if growth > limits[limit_key]:
+                failures.append(f"кадр {frame}: {key} вырос на {growth:.1f} МБ "
+                                f"(предел {limits[limit_key]})")
+        if sample["entities"] > limits["entities"]:
+            failures.append(f"кадр {frame}: живых объектов {sample['entities']} "
+                            f"(предел {limits['entities']})")
+        drift = sample["frame_median_us"] / baseline["frame_median_us"]
+        if drift > limits["frame_drift"]:
+            failures.append(f"кадр {frame}: медиана кадра в {drift:.2f} раза больше опорной "
+                            f"(предел {limits['frame_drift']})")
+    return failures
+
+
+def format_sample(sample):
+    heap = "-" if sample["heap_mb"] is None else f"{sample['heap_mb']:.1f}"
+    rss = "-" if sample["rss_mb"] is None else f"{sample['rss_mb']:.1f}"
+    return (f"{sample['frame']:>10} {heap:>8} {rss:>8} {sample['entities']:>5} "
+            f"{sample['frame_median_us']:>9.1f} {sample['frame_p99_us']:>9.1f} "
+            f"{sample['day_night_cycles']:>6} {sample['restarts']:>8}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Длительный прогон автопилота с проверкой утечек")
+    parser.add_argument("--frames", type=int, default=1000000, help="сколько кадров прогнать")
+    parser.add_argument("--interval", type=int, default=10000, help="кадров между замерами")
+    parser.add_argument("--warmup", type=int, default=None,
+                        help="кадров прогрева до опорного замера (по умолчанию 2 цикла дня и ночи)")
+    parser.add_argument("--seed", type=int, default=0, help="зерно игры")
+    parser.add_argument("--draw-every", type=int, default=1, help="рисовать каждый N-й кадр")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="не следить за памятью Python (tracemalloc замедляет прогон)")
+    parser.add_argument("--max-heap-growth", type=float, default=DEFAULT_LIMITS["heap_growth_mb"],
+                        help="допустимый рост памяти Python, МБ")
+    parser.add_argument("--max-rss-growth", type=float, default=DEFAULT_LIMITS["rss_growth_mb"],
+                        help="допустимый рост RSS, МБ")
+    parser.add_argument("--max-entities", type=int, default=DEFAULT_LIMITS["entities"],
+                        help="допустимое число живых объектов")
+    parser.add_argument("--max-frame-drift", type=float, default=DEFAULT_LIMITS["frame_drift"],
+                        help="допустимое замедление медианы кадра (отношение к опорной)")
+    parser.add_argument("--csv", help="сохранить все замеры в CSV файл")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # Два полных цикла: кэши ночных спрайтов и текста успевают заполниться
+    warmup = args.warmup if args.warmup is not None else 2 * CYCLE_FRAMES
+    limits = {
+        "heap_growth_mb": args.max_heap_growth,
+        "rss_growth_mb": args.max_rss_growth,
+        "entities": args.max_entities,
+        "frame_drift": args.max_frame_drift,
+    }
+    print(f"{'frame':>10} {'heap MB':>8} {'RSS MB':>8} {'ents':>5} "
+          f"{'median us':>9} {'p99 us':>9} {'cycles':>6} {'restarts':>8}")
+    started = time.perf_counter()
+    samples = run_soak(args.frames, args.interval, args.seed, args.draw_every,
+                       not args.no_tracemalloc, lambda sample: print(format_sample(sample), flush=True))
+    elapsed = time.perf_counter() - started
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(samples[0]))
+            writer.writeheader()
+            writer.writerows(samples)
+    failures = check_limits(samples, warmup, limits)
+    print(f"Кадров: {args.frames}, {elapsed:.0f} с, опорный замер после {warmup} кадров")
+    if failures:
+        print("ПРОВАЛ:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("OK: рост памяти, объекты и время кадра в пределах")
@@ -0,0 +1,128 @@
+"""Перебор параметров автопилота на пуле процессов.
+
+Каждый кандидат - словарь параметров для Dino.configure_autopilot:
+параметры эвристики автопилота или табличная стратегия для сравнения.
+Кандидаты раздаются по всем ядрам, каждый процесс играет серию headless
+игр с фиксированными зернами, а результаты сводятся в рейтинг по
+среднему и медианному счету с разбивкой причин проигрыша.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import main
+
+# Диапазоны для случайного поиска: (минимум, максимум)
+SEARCH_SPACE = {
+    'vision_distance': (150, 400),
+    'jump_adjustment': (0.8, 1.3),
+    'low_ptero_distance': (1.0, 1.6),
+    'high_ptero_distance': (1.1, 1.8),
+    'near_power': (1.0, 1.4),
+    'high_ptero_power': (1.0, 1.4),
+    'tall_cactus_power': (1.0, 1.3),
+}
+
+# Игра создается один раз на процесс
+_worker_game = None
+
+
+def _init_worker():
+    global _worker_game
+    _worker_game = main.Game(headless=True)
+
+
+def play_episode(game, params, seed, max_frames):
+    """Одна headless игра автопилота с заданными параметрами"""
+    game.reset_game_state(seed)
+    game.dino.configure_autopilot(params)
+    game.dino.auto_mode = True
+    game.simulate(max_frames, fast_forward=True)
+    return game.score, game.crash_cause
+
+
+def evaluate(index, params, seeds, max_frames):
+    """Прогоняет кандидата на всех зернах (выполняется в процессе пула)"""
+    scores = []
+    causes = {"cactus": 0, "pterodactyl": 0, "survived": 0}
+    for seed in seeds:
+        score, cause = play_episode(_worker_game, params, seed, max_frames)
+        scores.append(score)
+        causes[cause or "survived"] += 1
+    return index, scores, causes
+
+
+def sample_candidates(count, rng):
+    """Кандидаты: табличный автопилот и эвристика по умолчанию для сравнения,
+    затем случайные точки пространства поиска параметров эвристики"""
+    candidates = [{'strategy': 'table'}, {'strategy': 'heuristic'}]
+    for _ in range(count - 2):
+        params = {'strategy': 'heuristic'}
+        params.update({
+            key: round(rng.uniform(low, high), 3)
+            for key, (low, high) in SEARCH_SPACE.items()
+        })
+        candidates.append(params)
+    return candidates[:count]
+
+
+def run_sweep(candidates, episodes=50, max_frames=20000, seed=0, workers=None):
+    """Оценивает кандидатов параллельно, возвращает отсортированный рейтинг"""
+    seeds = [seed + i for i in range(episodes)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(evaluate, index, params, seeds, max_frames)
+            for index, params in enumerate(candidates)
+        ]
+        for future in as_completed(futures):
+            index, scores, causes = future.result()
+            results.append({
+                "candidate": index,
+                "params": candidates[index],
+                "mean": statistics.fmean(scores),
+                "median": statistics.median(scores),
+                "best": max(scores),
+                "deaths": causes,
+            })
+    results.sort(key=lambda r: (r["mean"], r["median"]), reverse=True)
+    return results
+
+
+def print_report(results, top):
+    print(f"{'#':>3} {'mean':>8} {'median':>8} {'best':>6} {'cactus':>7} {'ptero':>6}  params")
+    for place, result in enumerate(results[:top], 1):
+        deaths = result["deaths"]
+        params = ", ".join(f"{k}={v}" for k, v in result["params"].items()) or "по умолчанию"
+        print(f"{place:>3} {result['mean']:>8.1f} {result['median']:>8.1f} {result['best']:>6} "
+              f"{deaths['cactus']:>7} {deaths['pterodactyl']:>6}  {params}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Перебор параметров автопилота")
+    parser.add_argument("--candidates", type=int, default=32, help="количество наборов параметров")
+    parser.add_argument("--episodes", type=int, default=50, help="игр на один набор")
+    parser.add_argument("--frames", type=int, default=20000, help="максимум кадров на игру")
+    parser.add_argument("--seed", type=int, default=0, help="зерно для кандидатов и игр")
+    parser.add_argument("--workers", type=int, default=None, help="процессов (по умолчанию все ядра)")
+    parser.add_argument("--top", type=int, default=10, help="сколько строк рейтинга показать")
+    parser.add_argument("--json", help="сохранить полный рейтинг в JSON файл")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    candidates = sample_candidates(args.candidates, random.Random(args.seed))
+    started = time.perf_counter()
+    results = run_sweep(candidates, args.episodes, args.frames, args.seed, args.workers)
+    print(f"Кандидатов: {len(candidates)}, игр на кандидата: {args.episodes}, "
+          f"{time.perf_counter() - started:.1f} с")
+    print_report(results, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)